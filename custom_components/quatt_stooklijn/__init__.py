@@ -9,7 +9,9 @@ import voluptuous as vol
 import yaml
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .ch_max_water import ChMaxWaterController
 from .const import (
@@ -27,6 +29,8 @@ from .const import (
     SERVICE_CLEAR_DATA,
     SERVICE_RUN_ANALYSIS,
 )
+from .analysis.quatt import clear_history_memo
+from .analysis.stooklijn import clear_knee_memo, clear_live_history_cache
 from .coordinator import (
     QuattStooklijnCoordinator,
     QuattStooklijnData,
@@ -34,6 +38,8 @@ from .coordinator import (
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 _DASHBOARD_URL = "quatt-warmteanalyse"
 _DASHBOARD_YAML = Path(__file__).parent / "dashboard.yaml"
 
@@ -128,6 +134,102 @@ async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None
     await hass.config_entries.async_reload(entry.entry_id)
 
 
+def _set_analysis_running(coordinator: QuattStooklijnCoordinator) -> None:
+    """Mark an analysis as running and notify sensors immediately."""
+    coordinator.data.analysis_status = "running"
+    coordinator.async_set_updated_data(coordinator.data)
+
+
+def _schedule_startup_analysis(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: QuattStooklijnCoordinator
+) -> None:
+    """Start the analysis as a background task once HA is fully started.
+
+    The Quatt services and the recorder may not be ready during bootstrap, so
+    on a cold boot the task is deferred to EVENT_HOMEASSISTANT_STARTED.
+    """
+
+    @callback
+    def _async_start_analysis() -> None:
+        _LOGGER.info("Running automatic startup analysis")
+        _set_analysis_running(coordinator)
+        # Debounced refresh; failures are recorded by the coordinator as "error"
+        entry.async_create_background_task(
+            hass, coordinator.async_request_refresh(), "quatt_stooklijn_startup_analysis"
+        )
+
+    from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+    if hass.is_running:
+        # HA already running (e.g. integration reload), run immediately
+        _async_start_analysis()
+        return
+
+    # HA still starting, wait for full startup
+    _startup_fired = False
+
+    @callback
+    def _async_start_analysis_once(_event) -> None:
+        nonlocal _startup_fired
+        _startup_fired = True
+        _async_start_analysis()
+
+    cancel = hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_STARTED, _async_start_analysis_once
+    )
+
+    def _cancel_if_pending() -> None:
+        # Alleen annuleren als het event nog niet afgevuurd is.
+        # Als het event al afgevuurd is, heeft async_listen_once de
+        # listener al verwijderd — cancel() aanroepen zou dan een
+        # ValueError + log-melding in HA's core triggeren.
+        if not _startup_fired:
+            cancel()
+
+    entry.async_on_unload(_cancel_if_pending)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the integration services once for the domain lifetime."""
+    hass.data.setdefault(DOMAIN, {})
+
+    async def handle_run_analysis(call: ServiceCall) -> None:
+        """Handle the run_analysis service call."""
+        # Run analysis for all configured entries
+        for coord in hass.data[DOMAIN].values():
+            if isinstance(coord, QuattStooklijnCoordinator):
+                _LOGGER.info("Triggering Quatt Stooklijn analysis")
+                _set_analysis_running(coord)
+                try:
+                    await coord.async_refresh()
+                except Exception:
+                    coord.data.analysis_status = "error"
+                    coord.async_set_updated_data(coord.data)
+                    raise
+
+    async def handle_clear_data(call: ServiceCall) -> None:
+        """Handle the clear_data service call."""
+        for coord in hass.data[DOMAIN].values():
+            if isinstance(coord, QuattStooklijnCoordinator):
+                _LOGGER.info("Clearing Quatt Stooklijn analysis data")
+                coord.data = QuattStooklijnData()
+                coord.async_set_updated_data(coord.data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RUN_ANALYSIS,
+        handle_run_analysis,
+        schema=vol.Schema({}),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAR_DATA,
+        handle_clear_data,
+        schema=vol.Schema({}),
+    )
+
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Quatt Stooklijn from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -150,47 +252,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await _async_setup_dashboard(hass)
 
     # Auto-run analysis on startup so dashboards are populated immediately
-    async def _async_startup_analysis(_event=None) -> None:
-        """Run analysis automatically after HA startup."""
-        _LOGGER.info("Running automatic startup analysis")
-        coordinator.data.analysis_status = "running"
-        coordinator.async_set_updated_data(coordinator.data)
-        try:
-            await coordinator.async_refresh()
-        except Exception:
-            coordinator.data.analysis_status = "error"
-            coordinator.async_set_updated_data(coordinator.data)
-            _LOGGER.exception("Startup analysis failed")
-
-    # Schedule after HA is fully started to avoid blocking boot
-    from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
-    if hass.is_running:
-        # HA already running (e.g. integration reload), run immediately
-        entry.async_create_background_task(
-            hass, _async_startup_analysis(), "quatt_stooklijn_startup_analysis"
-        )
-    else:
-        # HA still starting, wait for full startup
-        _startup_fired = False
-
-        async def _async_startup_analysis_once(_event=None) -> None:
-            nonlocal _startup_fired
-            _startup_fired = True
-            await _async_startup_analysis(_event)
-
-        cancel = hass.bus.async_listen_once(
-            EVENT_HOMEASSISTANT_STARTED, _async_startup_analysis_once
-        )
-
-        def _cancel_if_pending() -> None:
-            # Alleen annuleren als het event nog niet afgevuurd is.
-            # Als het event al afgevuurd is, heeft async_listen_once de
-            # listener al verwijderd — cancel() aanroepen zou dan een
-            # ValueError + log-melding in HA's core triggeren.
-            if not _startup_fired:
-                cancel()
-
-        entry.async_on_unload(_cancel_if_pending)
+    _schedule_startup_analysis(hass, entry, coordinator)
 
     # chMaxWaterTemperatuur bijsturing (opt-in)
     if merged_config.get(CONF_CH_MAX_WATER_ENABLED, False):
@@ -204,49 +266,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN][f"{entry.entry_id}_ch_max_water"] = controller
         entry.async_on_unload(controller.async_setup())
 
-    # Register service (once for the domain)
-    if not hass.services.has_service(DOMAIN, SERVICE_RUN_ANALYSIS):
-
-        async def handle_run_analysis(call: ServiceCall) -> None:
-            """Handle the run_analysis service call."""
-            # Run analysis for all configured entries
-            for coord in hass.data[DOMAIN].values():
-                if isinstance(coord, QuattStooklijnCoordinator):
-                    _LOGGER.info("Triggering Quatt Stooklijn analysis")
-                    # Set status to "running" and notify sensors immediately
-                    coord.data.analysis_status = "running"
-                    coord.async_set_updated_data(coord.data)
-                    try:
-                        await coord.async_refresh()
-                    except Exception:
-                        coord.data.analysis_status = "error"
-                        coord.async_set_updated_data(coord.data)
-                        raise
-
-        hass.services.async_register(
-            DOMAIN,
-            SERVICE_RUN_ANALYSIS,
-            handle_run_analysis,
-            schema=vol.Schema({}),
-        )
-
-    if not hass.services.has_service(DOMAIN, SERVICE_CLEAR_DATA):
-
-        async def handle_clear_data(call: ServiceCall) -> None:
-            """Handle the clear_data service call."""
-            for coord in hass.data[DOMAIN].values():
-                if isinstance(coord, QuattStooklijnCoordinator):
-                    _LOGGER.info("Clearing Quatt Stooklijn analysis data")
-                    coord.data = QuattStooklijnData()
-                    coord.async_set_updated_data(coord.data)
-
-        hass.services.async_register(
-            DOMAIN,
-            SERVICE_CLEAR_DATA,
-            handle_clear_data,
-            schema=vol.Schema({}),
-        )
-
     return True
 
 
@@ -256,10 +275,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
-
-    # Remove service if no entries left
-    if not hass.data[DOMAIN]:
-        hass.services.async_remove(DOMAIN, SERVICE_RUN_ANALYSIS)
-        hass.services.async_remove(DOMAIN, SERVICE_CLEAR_DATA)
+        # Drop module-level analysis caches; options may change on reload
+        clear_live_history_cache()
+        clear_history_memo()
+        clear_knee_memo()
 
     return unload_ok
@@ -5,15 +5,36 @@ from __future__ import annotations
 import logging
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 from homeassistant.components.recorder import get_instance
 from homeassistant.components.recorder.history import state_changes_during_period
+from homeassistant.components.recorder.statistics import statistics_during_period
 from homeassistant.core import HomeAssistant
 
+from .utils import daily_mean, states_to_series
+
 _LOGGER = logging.getLogger(__name__)
 
 
+def _stats_to_series(rows: list[dict]) -> pd.Series:
+    """Turn hourly recorder statistics rows into a cumulative-sum Series.
+
+    The index is the (naive, UTC) start of each hour; rows without a sum are
+    skipped.
+    """
+    rows = [r for r in rows if r.get("start") is not None and r.get("sum") is not None]
+    index = pd.to_datetime(
+        np.fromiter((r["start"] for r in rows), dtype=np.float64, count=len(rows)),
+        unit="s",
+    )
+    return pd.Series(
+        np.fromiter((r["sum"] for r in rows), dtype=np.float64, count=len(rows)),
+        index=index.rename("timestamp"),
+    )
+
+
 async def async_fetch_gas_data(
     hass: HomeAssistant,
     entity_id: str,
@@ -24,6 +45,7 @@ async def async_fetch_gas_data(
     hot_water_temp_threshold: float = 18.0,
     df_hourly_hp: pd.DataFrame | None = None,
     temp_entities: list[str] | None = None,
+    daily_temp_hp: pd.Series | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Fetch gas consumption data and return (df_gas_hourly, df_gas_daily).
 
@@ -37,9 +59,14 @@ async def async_fetch_gas_data(
         hot_water_temp_threshold: Days above this temp are hot-water-only
         df_hourly_hp: Optional heat pump hourly data for temperature reuse
         temp_entities: Temperature sensor entity IDs to fetch from recorder
+        daily_temp_hp: Optional precomputed daily mean of df_hourly_hp's
+            temperature (as returned by async_fetch_quatt_insights)
     """
     from homeassistant.util import dt as dt_util
 
+    # Useful heat per m³ of gas burnt
+    kwh_per_m3 = calorific_value * boiler_efficiency
+
     tz = dt_util.get_time_zone(hass.config.time_zone)
     start_dt = dt_util.as_utc(
         datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=tz)
@@ -48,45 +75,62 @@ async def async_fetch_gas_data(
         datetime.strptime(f"{end_date} 23:59:59", "%Y-%m-%d %H:%M:%S").replace(tzinfo=tz)
     )
 
-    # Fetch history from recorder
-    def _fetch():
-        return state_changes_during_period(hass, start_dt, end_dt, entity_id)
-
-    states = await get_instance(hass).async_add_executor_job(_fetch)
-
-    entity_states = states.get(entity_id, [])
-    if not entity_states:
+    # Fetch gas + temperature history from recorder in a single executor job.
+    # Gas prefers hourly long-term statistics (pre-aggregated "sum", available
+    # for meters with a state_class); raw state changes are the fallback.
+    # Temperature entities are tried in preference order until one has data.
+    # state_changes_during_period takes one entity_id per call.
+    temp_ids = [eid for eid in dict.fromkeys(temp_entities or []) if eid != entity_id]
+
+    def _history(eid: str) -> pd.Series:
+        states = state_changes_during_period(hass, start_dt, end_dt, eid)
+        return states_to_series(states.get(eid, []))
+
+    def _fetch_all() -> tuple[pd.Series, bool, str | None, pd.Series | None]:
+        gas_stats = statistics_during_period(
+            hass,
+            start_time=start_dt,
+            end_time=end_dt,
+            statistic_ids={entity_id},
+            period="hour",
+            units=None,
+            types={"sum"},
+        ).get(entity_id, [])
+        gas_series = _stats_to_series(gas_stats)
+        from_stats = not gas_series.empty
+        if not from_stats:
+            gas_series = _history(entity_id)
+            if gas_series.empty:
+                return gas_series, from_stats, None, None
+        for eid in temp_ids:
+            temp_series = _history(eid)
+            if not temp_series.empty:
+                return gas_series, from_stats, eid, temp_series
+        return gas_series, from_stats, None, None
+
+    gas_series, from_stats, temp_entity, temp_series = await get_instance(
+        hass
+    ).async_add_executor_job(_fetch_all)
+
+    if gas_series.empty:
         _LOGGER.warning("No gas data found for entity: %s", entity_id)
         return pd.DataFrame(), pd.DataFrame()
+    if from_stats:
+        _LOGGER.debug("Gas data from recorder statistics: %d hours", len(gas_series))
 
-    # Build DataFrame from state history
-    records = []
-    for state in entity_states:
-        try:
-            value = float(state.state)
-            records.append(
-                {
-                    "timestamp": state.last_changed.replace(tzinfo=None),
-                    "state": value,
-                }
-            )
-        except (ValueError, TypeError):
-            continue
-
-    if not records:
-        return pd.DataFrame(), pd.DataFrame()
-
-    df_gas = pd.DataFrame(records)
-    df_gas = df_gas.set_index("timestamp").sort_index()
+    df_gas = gas_series.to_frame("state").sort_index()
 
     # Calculate consumption differences (cumulative meter)
-    df_gas["gas_m3"] = df_gas["state"].diff()
-    df_gas = df_gas[df_gas["gas_m3"] >= 0]
-    df_gas = df_gas[df_gas["gas_m3"] < 10]  # Remove unrealistic spikes
+    # Drop meter resets (negative) and unrealistic spikes in one mask
+    gas_m3 = np.diff(df_gas["state"].to_numpy(), prepend=np.nan)
+    mask = (gas_m3 >= 0) & (gas_m3 < 10)
+    gas_m3 = gas_m3[mask]
 
     # Convert to heat output
-    df_gas["heat_kwh"] = df_gas["gas_m3"] * calorific_value * boiler_efficiency
-    df_gas["heat_w"] = df_gas["heat_kwh"] * 1000
+    heat_kwh = gas_m3 * kwh_per_m3
+    df_gas = df_gas.iloc[mask].assign(
+        gas_m3=gas_m3, heat_kwh=heat_kwh, heat_w=heat_kwh * 1000
+    )
 
     # Resample to hourly
     df_gas_hourly = df_gas.resample("h").agg(
@@ -99,68 +143,48 @@ async def async_fetch_gas_data(
     # Temperature data & hot water correction
     has_temp = False
 
-    # Primary: fetch temperature from HA recorder for the gas date range
-    if temp_entities:
-        for temp_entity in temp_entities:
-            def _fetch_temp(eid=temp_entity):
-                return state_changes_during_period(hass, start_dt, end_dt, eid)
-
-            temp_states = await get_instance(hass).async_add_executor_job(_fetch_temp)
-            entity_temp_states = temp_states.get(temp_entity, [])
-            if entity_temp_states:
-                temp_records = []
-                for s in entity_temp_states:
-                    try:
-                        ts = s.last_changed
-                        if ts.tzinfo is not None:
-                            ts = ts.replace(tzinfo=None)
-                        temp_records.append(
-                            {"timestamp": ts, "temperatureOutside": float(s.state)}
-                        )
-                    except (ValueError, TypeError):
-                        continue
-                if temp_records:
-                    df_temp = pd.DataFrame(temp_records)
-                    df_temp["timestamp"] = pd.to_datetime(
-                        df_temp["timestamp"]
-                    ).dt.floor("h")
-                    df_temp = df_temp.groupby("timestamp")[
-                        "temperatureOutside"
-                    ].median()
-                    df_temp = df_temp.to_frame()
-
-                    df_gas_hourly = df_gas_hourly.join(df_temp, how="left")
-
-                    daily_temp = df_temp.groupby(df_temp.index.date)[
-                        "temperatureOutside"
-                    ].mean()
-                    df_gas_daily["avg_temperatureOutside"] = (
-                        df_gas_daily.index.map(
-                            lambda d: daily_temp.get(d.date(), None)
-                        )
-                    )
-                    has_temp = True
-                    _LOGGER.info(
-                        "Gas temperature from recorder: %s (%d records)",
-                        temp_entity,
-                        len(temp_records),
-                    )
-                    break
+    # Primary: temperature from HA recorder for the gas date range
+    if temp_series is not None:
+        df_temp = (
+            temp_series.groupby(temp_series.index.floor("h"))
+            .median()
+            .to_frame("temperatureOutside")
+        )
+
+        df_gas_hourly = df_gas_hourly.join(df_temp, how="left")
+
+        daily_temp = daily_mean(df_temp["temperatureOutside"])
+        df_gas_daily["avg_temperatureOutside"] = daily_temp.reindex(
+            df_gas_daily.index
+        ).to_numpy()
+        has_temp = True
+        _LOGGER.info(
+            "Gas temperature from recorder: %s (%d records)",
+            temp_entity,
+            len(temp_series),
+        )
 
     # Fallback: use heat pump hourly data (works when date ranges overlap)
     if not has_temp and df_hourly_hp is not None and not df_hourly_hp.empty:
         if "temperatureOutside" in df_hourly_hp.columns:
-            df_hp_temp = df_hourly_hp[["temperatureOutside"]].copy()
-            if df_hp_temp.index.tz is not None:
-                df_hp_temp.index = df_hp_temp.index.tz_localize(None)
-            df_gas_hourly = df_gas_hourly.join(df_hp_temp, how="left")
-
-            daily_temp = df_hourly_hp.groupby(df_hourly_hp.index.date)[
-                "temperatureOutside"
-            ].mean()
-            df_gas_daily["avg_temperatureOutside"] = df_gas_daily.index.map(
-                lambda d: daily_temp.get(d.date(), None)
+            hp_temp = df_hourly_hp["temperatureOutside"]
+            # Gas timestamps are naive UTC: align a tz-aware index once,
+            # without copying the frame.
+            hp_index = hp_temp.index
+            if hp_index.tz is not None:
+                hp_index = hp_index.tz_convert("UTC").tz_localize(None)
+            df_gas_hourly = df_gas_hourly.join(
+                hp_temp.set_axis(hp_index), how="left"
+            )
+
+            daily_temp = (
+                daily_temp_hp
+                if daily_temp_hp is not None
+                else daily_mean(hp_temp)
             )
+            df_gas_daily["avg_temperatureOutside"] = daily_temp.reindex(
+                df_gas_daily.index
+            ).to_numpy()
             has_temp = True
 
     # Hot water correction
@@ -171,19 +195,19 @@ async def async_fetch_gas_data(
 
         if len(warm_days) >= 3:
             hot_water_gas_m3 = warm_days["gas_m3"].median()
-            hot_water_kwh = hot_water_gas_m3 * calorific_value * boiler_efficiency
-
-            df_gas_daily["gas_m3_hot_water"] = hot_water_gas_m3
-            df_gas_daily["heat_kwh_hot_water"] = hot_water_kwh
-            df_gas_daily["gas_m3_heating"] = (
-                df_gas_daily["gas_m3"] - hot_water_gas_m3
-            ).clip(lower=0)
-            df_gas_daily["heat_kwh_heating"] = (
-                df_gas_daily["gas_m3_heating"] * calorific_value * boiler_efficiency
+            hot_water_kwh = hot_water_gas_m3 * kwh_per_m3
+
+            gas_m3_heating = np.clip(
+                df_gas_daily["gas_m3"].to_numpy() - hot_water_gas_m3, 0, None
+            )
+            heat_kwh_heating = gas_m3_heating * kwh_per_m3
+            df_gas_daily = df_gas_daily.assign(
+                gas_m3_hot_water=hot_water_gas_m3,
+                heat_kwh_hot_water=hot_water_kwh,
+                gas_m3_heating=gas_m3_heating,
+                heat_kwh_heating=heat_kwh_heating,
+                totalHeatPerHour=heat_kwh_heating * 1000 / 24,
             )
-            df_gas_daily["totalHeatPerHour"] = (
-                df_gas_daily["heat_kwh_heating"] * 1000
-            ) / 24
             _LOGGER.info(
                 "Hot water correction applied: %.2f m³/day baseline", hot_water_gas_m3
             )
@@ -7,7 +7,7 @@ from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
-from .utils import calc_r2, robust_linear_fit, select_heating
+from .utils import calc_r2_linear, robust_linear_fit, select_heating
 
 
 @dataclass
@@ -48,7 +48,9 @@ def calculate_heat_loss(
     if not all(c in df_daily.columns for c in cols_needed):
         return result
 
-    plot_data = df_daily[cols_needed].replace([np.inf, -np.inf], np.nan).dropna()
+    # Finite rows only (drops NaN and ±inf in one mask)
+    finite = np.isfinite(df_daily[cols_needed].to_numpy(dtype=np.float64)).all(axis=1)
+    plot_data = df_daily.loc[finite, cols_needed]
 
     if len(plot_data) < 5:
         return result
@@ -60,8 +62,12 @@ def calculate_heat_loss(
         return result
 
     # Two-pass regression with outlier removal
-    x_all = heating_data["avg_temperatureOutside"].values
-    y_all = heating_data["totalHeatPerHour"].values
+    x_all = np.ascontiguousarray(
+        heating_data["avg_temperatureOutside"].to_numpy(), dtype=np.float64
+    )
+    y_all = np.ascontiguousarray(
+        heating_data["totalHeatPerHour"].to_numpy(), dtype=np.float64
+    )
 
     slope, intercept, inlier_mask = robust_linear_fit(x_all, y_all)
 
@@ -71,7 +77,7 @@ def calculate_heat_loss(
     if len(x) < 5:
         return result
 
-    r2 = calc_r2(y, slope * x + intercept)
+    r2 = calc_r2_linear(x, y, slope)
 
     result.slope = float(slope)
     result.intercept = float(intercept)
@@ -82,43 +88,29 @@ def calculate_heat_loss(
         result.balance_point = float(-intercept / slope)
 
     # Heat demand at specific temperatures (with COP if available)
-    result.heat_at_temps = {}
-
-    # Check if COP data is available for interpolation
-    has_cop = "averageCOP" in df_daily.columns
-    cop_data = None
-    if has_cop:
-        cop_df = df_daily[["avg_temperatureOutside", "averageCOP"]].replace(
-            [np.inf, -np.inf], np.nan
-        ).dropna()
-        if len(cop_df) >= 2:
-            cop_data = cop_df.sort_values("avg_temperatureOutside")
-
-    for temp in [-10, -5, 0, 5, 10, 15]:
-        demand = slope * temp + intercept
-        heat_value = max(0.0, float(demand))
-
-        # Interpolate COP if data is available
-        cop_value = None
-        if cop_data is not None and len(cop_data) >= 2:
-            cop_value = float(np.interp(
-                temp,
-                cop_data["avg_temperatureOutside"].values,
-                cop_data["averageCOP"].values
-            ))
-
-        result.heat_at_temps[temp] = {
-            "heat": heat_value,
-            "cop": cop_value
-        }
+    temps = np.array([-10, -5, 0, 5, 10, 15], dtype=np.float64)
+    demands = np.maximum(0.0, slope * temps + intercept)
+
+    # Interpolate COP in one sweep if data is available
+    cops: list[float | None] = [None] * len(temps)
+    if "averageCOP" in df_daily.columns:
+        cop_temp = df_daily["avg_temperatureOutside"].to_numpy(dtype=np.float64)
+        cop_vals = df_daily["averageCOP"].to_numpy(dtype=np.float64)
+        cop_finite = np.isfinite(cop_temp) & np.isfinite(cop_vals)
+        if cop_finite.sum() >= 2:
+            cop_temp = cop_temp[cop_finite]
+            order = np.argsort(cop_temp, kind="stable")
+            cops = np.interp(temps, cop_temp[order], cop_vals[cop_finite][order]).tolist()
+
+    result.heat_at_temps = {
+        int(t): {"heat": float(d), "cop": cop}
+        for t, d, cop in zip(temps, demands, cops)
+    }
 
     # Scatter data for dashboard (only heating days, matching the regression)
     result.scatter_data = [
-        {
-            "temp": round(float(row["avg_temperatureOutside"]), 1),
-            "heat": round(float(row["totalHeatPerHour"]), 0),
-        }
-        for _, row in heating_data.iterrows()
+        {"temp": float(t), "heat": float(h)}
+        for t, h in zip(np.round(x_all, 1), np.round(y_all, 0))
     ]
 
     return result
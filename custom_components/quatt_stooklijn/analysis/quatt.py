@@ -9,9 +9,11 @@ Uses a hybrid approach:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 
 from homeassistant.components.recorder import get_instance
@@ -22,26 +24,115 @@ from homeassistant.util import dt as dt_util
 from ..cache import QuattInsightsCache
 from ..const import (
     API_FETCH_DAYS,
+    API_MAX_CONCURRENT_CALLS,
     RECORDER_BOILER_HEAT_ENTITY,
     RECORDER_POWER_INPUT_ENTITY,
 )
-from .utils import classify_heat_mode
+from .utils import classify_heat_mode, daily_mean
 
 _LOGGER = logging.getLogger(__name__)
 
 # Global cache instance (will be initialized on first use)
 _cache: QuattInsightsCache | None = None
+# Serializes first-time initialization so concurrent callers load it once
+_cache_lock = asyncio.Lock()
+
+# Memoized cache-only history fetch: {(start, end): (cache generation, result)}.
+# The historical window only depends on cache contents, so an unchanged cache
+# means the previous result can be reused as-is.
+_history_memo: dict[
+    tuple[str, str], tuple[int, tuple[list[dict], list[dict], int, int]]
+] = {}
+
+
+def clear_history_memo() -> None:
+    """Drop the memoized history window (e.g. on entry unload)."""
+    _history_memo.clear()
 
 
 async def _get_cache(hass: HomeAssistant) -> QuattInsightsCache:
     """Get or create the global cache instance."""
     global _cache
-    if _cache is None:
-        _cache = QuattInsightsCache(hass)
-        await _cache.async_load()
+    async with _cache_lock:
+        if _cache is None:
+            cache = QuattInsightsCache(hass)
+            await cache.async_load()
+            _cache = cache
     return _cache
 
 
+def _build_recorder_daily(
+    stats: dict, power_entity: str, temp_entity: str
+) -> pd.DataFrame:
+    """Turn recorder daily mean statistics into the daily DataFrame.
+
+    Blocking pandas work; runs in the executor together with the fetch.
+    """
+    if not stats:
+        _LOGGER.warning("No recorder statistics available")
+        return pd.DataFrame()
+
+    # One Series per sensor, aligned on day by a single concat.
+    # sensor -> (column, factor); mean W * 24h = daily Wh
+    columns = {
+        power_entity: ("totalHpHeat", 24.0),
+        RECORDER_POWER_INPUT_ENTITY: ("totalHpElectric", 24.0),
+        RECORDER_BOILER_HEAT_ENTITY: ("totalBoilerHeat", 24.0),
+        temp_entity: ("avg_temperatureOutside", 1.0),
+    }
+    series_by_col: dict[str, pd.Series] = {}
+
+    for sensor_id, rows in stats.items():
+        mapping = columns.get(sensor_id)
+        if mapping is None:
+            continue
+        col, factor = mapping
+        rows = [
+            row for row in rows
+            if row.get("start") is not None and row.get("mean") is not None
+        ]
+        if not rows:
+            continue
+        days = (
+            pd.to_datetime([row["start"] for row in rows], unit="s", utc=True)
+            .floor("D")
+            .tz_localize(None)
+        )
+        values = np.fromiter(
+            (row["mean"] for row in rows), dtype=np.float64, count=len(rows)
+        )
+        series_by_col[col] = pd.Series(values * factor, index=days)
+
+    if not series_by_col:
+        _LOGGER.warning("Recorder statistics returned no usable data")
+        return pd.DataFrame()
+
+    df = pd.concat(series_by_col, axis=1).sort_index()
+    df.index.name = "date"
+
+    # Fill missing energy columns with 0
+    for col in ("totalHpHeat", "totalHpElectric", "totalBoilerHeat"):
+        if col not in df.columns:
+            df[col] = 0.0
+
+    # Calculate derived columns
+    heat = df[["totalHpHeat", "totalBoilerHeat"]].to_numpy(
+        dtype=np.float64, na_value=0.0
+    )
+    df["totalHeatPerHour"] = heat.sum(axis=1) / 24
+    df["totalBoilerGas"] = 0.0  # Not available from recorder
+
+    # Calculate COP from energy totals (not from the COP sensor, which
+    # averages over 24h including off-periods and gives too-low values)
+    hp_heat = df["totalHpHeat"].fillna(0).to_numpy(dtype=np.float64)
+    hp_elec = df["totalHpElectric"].fillna(0).to_numpy(dtype=np.float64)
+    cop = np.zeros_like(hp_heat)
+    np.divide(hp_heat, hp_elec, out=cop, where=hp_elec > 0)
+    df["averageCOP"] = cop
+
+    return df
+
+
 async def _async_fetch_recorder_daily(
     hass: HomeAssistant,
     start_date: str,
@@ -66,8 +157,10 @@ async def _async_fetch_recorder_daily(
         RECORDER_BOILER_HEAT_ENTITY,
     }
 
-    def _fetch_stats() -> dict:
-        return statistics_during_period(
+    def _fetch_and_build() -> pd.DataFrame:
+        # Fetch and DataFrame construction both block, so keep them together
+        # off the event loop
+        stats = statistics_during_period(
             hass,
             start_time=start_dt,
             end_time=end_dt,
@@ -76,75 +169,17 @@ async def _async_fetch_recorder_daily(
             units=None,
             types={"mean"},
         )
+        return _build_recorder_daily(stats, power_entity, temp_entity)
 
-    stats = await get_instance(hass).async_add_executor_job(_fetch_stats)
+    df = await get_instance(hass).async_add_executor_job(_fetch_and_build)
 
-    if not stats:
-        _LOGGER.warning("No recorder statistics available")
-        return pd.DataFrame()
-
-    # Build a dict of {date: {column: value}}
-    records: dict[str, dict] = {}
-
-    for sensor_id, rows in stats.items():
-        for row in rows:
-            start_ts = row.get("start")
-            if start_ts is None:
-                continue
-            day = dt_util.utc_from_timestamp(start_ts).strftime("%Y-%m-%d")
-
-            if day not in records:
-                records[day] = {}
-
-            mean_val = row.get("mean")
-            if mean_val is None:
-                continue
-
-            if sensor_id == power_entity:
-                # Mean W * 24h = daily Wh
-                records[day]["totalHpHeat"] = mean_val * 24
-            elif sensor_id == RECORDER_POWER_INPUT_ENTITY:
-                records[day]["totalHpElectric"] = mean_val * 24
-            elif sensor_id == RECORDER_BOILER_HEAT_ENTITY:
-                records[day]["totalBoilerHeat"] = mean_val * 24
-            elif sensor_id == temp_entity:
-                records[day]["avg_temperatureOutside"] = mean_val
-
-    if not records:
-        _LOGGER.warning("Recorder statistics returned no usable data")
-        return pd.DataFrame()
-
-    df = pd.DataFrame.from_dict(records, orient="index")
-    df.index = pd.to_datetime(df.index)
-    df.index.name = "date"
-    df = df.sort_index()
-
-    # Fill missing columns with 0
-    for col in ("totalHpHeat", "totalHpElectric", "totalBoilerHeat"):
-        if col not in df.columns:
-            df[col] = 0
-
-    # Calculate derived columns
-    df["totalHeatPerHour"] = (
-        df["totalHpHeat"].fillna(0) + df["totalBoilerHeat"].fillna(0)
-    ) / 24
-    df["totalBoilerGas"] = 0.0  # Not available from recorder
-
-    # Calculate COP from energy totals (not from the COP sensor, which
-    # averages over 24h including off-periods and gives too-low values)
-    hp_heat = df["totalHpHeat"].fillna(0)
-    hp_elec = df["totalHpElectric"].fillna(0)
-    df["averageCOP"] = (hp_heat / hp_elec).replace(
-        [float("inf"), -float("inf")], 0
-    )
-    df.loc[hp_elec <= 0, "averageCOP"] = 0
-
-    _LOGGER.info(
-        "Recorder statistics: %d days (%s to %s)",
-        len(df),
-        df.index[0].strftime("%Y-%m-%d"),
-        df.index[-1].strftime("%Y-%m-%d"),
-    )
+    if not df.empty:
+        _LOGGER.info(
+            "Recorder statistics: %d days (%s to %s)",
+            len(df),
+            df.index[0].strftime("%Y-%m-%d"),
+            df.index[-1].strftime("%Y-%m-%d"),
+        )
 
     return df
 
@@ -156,19 +191,22 @@ async def _async_fetch_api_days(
     cache: QuattInsightsCache,
     *,
     cache_only: bool = False,
-) -> tuple[list[pd.DataFrame], list[dict], int, int]:
+) -> tuple[list[dict], list[dict], int, int]:
     """Fetch daily/hourly data from Quatt API for a date range, using cache.
 
+    Returns (hourly_rows, daily_records, api_calls_made, cache_hits). Hourly
+    rows are flat dicts (one per main-graph timestamp, temperature graphs
+    merged in) so the caller can build a single DataFrame at the end.
+
     Args:
         cache_only: If True, only return cached data (no API calls).
                     Used to retrieve historical hourly data beyond the API window.
     """
     all_dates = pd.date_range(start=start_dt, end=end_dt)
 
-    hourly_chunks = []
+    hourly_rows: list[dict] = []
     daily_records = []
     api_calls_made = 0
-    cache_hits = 0
 
     # Quatt ≥2.0 renamed get_insights → get_cic_insights; fall back for older installs.
     insights_service = (
@@ -177,17 +215,17 @@ async def _async_fetch_api_days(
         else "get_insights"
     )
 
-    for current_date in all_dates:
-        date_str = current_date.strftime("%Y-%m-%d")
-        data = None
-
-        # Check cache first
-        cached_data = cache.get(date_str)
-        if cached_data is not None:
-            data = cached_data
-            cache_hits += 1
-        elif not cache_only:
-            # Fetch from API (only when not in cache-only mode)
+    # Partition into cache hits and misses; only misses hit the API.
+    date_strs = all_dates.strftime("%Y-%m-%d").tolist()
+    day_data: dict[str, dict | None] = {d: cache.get(d) for d in date_strs}
+    cache_hits = sum(1 for data in day_data.values() if data is not None)
+    miss_dates = [] if cache_only else [d for d, data in day_data.items() if data is None]
+
+    sem = asyncio.Semaphore(API_MAX_CONCURRENT_CALLS)
+
+    async def _fetch_one(date_str: str) -> dict | None:
+        """Fetch one day from the Quatt API (at most API_MAX_CONCURRENT_CALLS at once)."""
+        async with sem:
             try:
                 response = await hass.services.async_call(
                     "quatt",
@@ -200,17 +238,26 @@ async def _async_fetch_api_days(
                     blocking=True,
                     return_response=True,
                 )
-
                 data = response.get("service_response", response)
-                api_calls_made += 1
-
-                if cache.should_cache(date_str):
-                    cache.set(date_str, data)
-
             except Exception as e:
                 _LOGGER.warning("Failed to fetch Quatt data for %s: %s", date_str, e)
-                continue
+                return None
+
+        if cache.should_cache(date_str):
+            cache.set(date_str, data)
+        return data
+
+    # Independent I/O-bound calls: run them concurrently.
+    if miss_dates:
+        results = await asyncio.gather(*map(_fetch_one, miss_dates))
+        for date_str, data in zip(miss_dates, results):
+            if data is not None:
+                day_data[date_str] = data
+                api_calls_made += 1
 
+    # Walk the dates in order so downstream concat stays deterministic.
+    for current_date, date_str in zip(all_dates, date_strs):
+        data = day_data[date_str]
         if data is None:
             continue
 
@@ -226,26 +273,27 @@ async def _async_fetch_api_days(
                 }
             )
 
-            # Process hourly graph data
-            df_main = pd.DataFrame(data.get("graph", []))
-            if not df_main.empty:
+            # Process hourly graph data: merge the temperature graphs into the
+            # main graph's points by timestamp (left join, copies so the cached
+            # payload is never mutated)
+            rows = {pt["timestamp"]: dict(pt) for pt in data.get("graph", [])}
+            if rows:
                 for graph_key in (
                     "outsideTemperatureGraph",
                     "waterTemperatureGraph",
                     "roomTemperatureGraph",
                 ):
-                    df_graph = pd.DataFrame(data.get(graph_key, []))
-                    if not df_graph.empty:
-                        df_main = pd.merge(
-                            df_main, df_graph, on="timestamp", how="left"
-                        )
-                hourly_chunks.append(df_main)
+                    for pt in data.get(graph_key, []):
+                        row = rows.get(pt["timestamp"])
+                        if row is not None:
+                            row.update(pt)
+                hourly_rows.extend(rows.values())
 
         except Exception as e:
             _LOGGER.warning("Failed to process data for %s: %s", date_str, e)
             continue
 
-    return hourly_chunks, daily_records, api_calls_made, cache_hits
+    return hourly_rows, daily_records, api_calls_made, cache_hits
 
 
 async def async_get_cache_stats(hass: HomeAssistant) -> dict:
@@ -261,13 +309,17 @@ async def async_fetch_quatt_insights(
     end_date: str,
     power_entity: str = "sensor.heatpump_total_power",
     temp_entity: str = "sensor.heatpump_hp1_temperature_outside",
-) -> tuple[pd.DataFrame, pd.DataFrame]:
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.Series | None]:
     """Fetch Quatt data using a hybrid approach.
 
     1. Recorder statistics for the full configured period (daily means)
     2. Cached hourly data for historical period (before API window, cache-only)
     3. Quatt API for the last API_FETCH_DAYS days (hourly detail, with API fallback)
     4. Merge: API daily data overwrites recorder data where available
+
+    Returns (df_hourly, df_daily, daily_avg_temp). daily_avg_temp is the daily
+    mean outdoor temperature derived from df_hourly (None without hourly
+    temperature data), returned so callers need not re-aggregate it.
     """
     cache = await _get_cache(hass)
 
@@ -302,7 +354,7 @@ async def async_fetch_quatt_insights(
     api_start = max(start_dt, end_dt - timedelta(days=API_FETCH_DAYS - 1))
     history_end = api_start - timedelta(days=1)
 
-    hourly_chunks = []
+    hourly_rows: list[dict] = []
     daily_records = []
     total_cache_hits = 0
 
@@ -312,10 +364,18 @@ async def async_fetch_quatt_insights(
             start_date,
             history_end.strftime("%Y-%m-%d"),
         )
-        hist_hourly, hist_daily, _, hist_cache_hits = await _async_fetch_api_days(
-            hass, start_dt, history_end, cache, cache_only=True
-        )
-        hourly_chunks.extend(hist_hourly)
+        memo_key = (start_dt.strftime("%Y-%m-%d"), history_end.strftime("%Y-%m-%d"))
+        memo = _history_memo.get(memo_key)
+        if memo is not None and memo[0] == cache.generation:
+            history = memo[1]
+        else:
+            history = await _async_fetch_api_days(
+                hass, start_dt, history_end, cache, cache_only=True
+            )
+            _history_memo.clear()
+            _history_memo[memo_key] = (cache.generation, history)
+        hist_hourly, hist_daily, _, hist_cache_hits = history
+        hourly_rows.extend(hist_hourly)
         daily_records.extend(hist_daily)
         total_cache_hits += hist_cache_hits
 
@@ -337,13 +397,13 @@ async def async_fetch_quatt_insights(
     api_hourly, api_daily, api_calls_made, api_cache_hits = (
         await _async_fetch_api_days(hass, api_start, end_dt, cache)
     )
-    hourly_chunks.extend(api_hourly)
+    hourly_rows.extend(api_hourly)
     daily_records.extend(api_daily)
     total_cache_hits += api_cache_hits
 
-    # Save cache if we made any API calls
+    # Save cache if we made any API calls (debounced by the Store)
     if api_calls_made > 0:
-        await cache.async_save()
+        cache.async_delay_save()
 
     _LOGGER.info(
         "API/cache data: %d days total (%d from cache, %d from API)",
@@ -353,61 +413,81 @@ async def async_fetch_quatt_insights(
     )
 
     # === Step 4: Build hourly DataFrame ===
-    if hourly_chunks:
-        hourly_chunks = [
-            c.dropna(axis=1, how="all")
-            for c in hourly_chunks
-            if not c.empty and not c.isna().all().all()
-        ]
-        df_hourly = pd.concat(hourly_chunks, ignore_index=True)
-        df_hourly["timestamp"] = pd.to_datetime(df_hourly["timestamp"])
-        df_hourly = df_hourly.set_index("timestamp")
-        df_hourly = df_hourly[~df_hourly.index.duplicated(keep="last")].sort_index()
+    if hourly_rows:
+        # One frame for all days (no per-day frames/merges/concat). All-NaN
+        # rows are harmless here: dropped by the downstream analyses.
+        # Parse the timestamps once with the ISO8601 fast path and use them
+        # directly as the index
+        index = pd.DatetimeIndex(
+            pd.to_datetime(
+                [row["timestamp"] for row in hourly_rows], format="ISO8601"
+            ),
+            name="timestamp",
+        )
+        df_hourly = pd.DataFrame(hourly_rows, index=index)
+        df_hourly = df_hourly.drop(columns="timestamp").dropna(axis=1, how="all")
+        # Rows arrive day by day in date order, so both passes are normally
+        # skipped; dedupe before sorting so "last" keeps arrival order
+        if not df_hourly.index.is_unique:
+            df_hourly = df_hourly[~df_hourly.index.duplicated(keep="last")]
+        if not df_hourly.index.is_monotonic_increasing:
+            df_hourly = df_hourly.sort_index()
     else:
         df_hourly = pd.DataFrame()
 
+    # Daily mean outdoor temperature from hourly data (computed once, reused
+    # here and by the gas analysis)
+    daily_avg_temp = None
+    if not df_hourly.empty and "temperatureOutside" in df_hourly.columns:
+        daily_avg_temp = daily_mean(df_hourly["temperatureOutside"])
+
     # === Step 5: Build API daily DataFrame ===
     df_daily_api = pd.DataFrame()
     if daily_records:
         df_daily_api = pd.DataFrame(daily_records)
         df_daily_api["date"] = pd.to_datetime(df_daily_api["date"])
         df_daily_api = df_daily_api.set_index("date")
+        # Explicit float64 so None (e.g. averageCOP) becomes NaN instead of
+        # leaving object columns that force Python-level arithmetic
+        df_daily_api = df_daily_api.astype(
+            {
+                "totalHpHeat": np.float64,
+                "totalHpElectric": np.float64,
+                "totalBoilerHeat": np.float64,
+                "totalBoilerGas": np.float64,
+                "averageCOP": np.float64,
+            }
+        )
 
-        # Calculate avg temperature from hourly data
-        if not df_hourly.empty and "temperatureOutside" in df_hourly.columns:
-            daily_avg_temp = df_hourly.groupby(df_hourly.index.date)[
-                "temperatureOutside"
-            ].mean()
-            df_daily_api["avg_temperatureOutside"] = df_daily_api.index.map(
-                lambda d: daily_avg_temp.get(d.date(), None)
-            )
+        # Attach avg temperature from hourly data
+        if daily_avg_temp is not None:
+            df_daily_api["avg_temperatureOutside"] = daily_avg_temp.reindex(
+                df_daily_api.index
+            ).to_numpy()
 
-        df_daily_api["totalHeatPerHour"] = (
-            df_daily_api.get("totalHpHeat", pd.Series(0)).fillna(0)
-            + df_daily_api.get("totalBoilerHeat", pd.Series(0)).fillna(0)
-        ) / 24
+        # Columns always exist (built from daily_records); missing values count as 0
+        heat = df_daily_api[["totalHpHeat", "totalBoilerHeat"]].to_numpy(
+            dtype=np.float64, na_value=0.0
+        )
+        df_daily_api["totalHeatPerHour"] = heat.sum(axis=1) / 24
 
         # Calculate COP if missing
         if (
             "averageCOP" not in df_daily_api.columns
             or df_daily_api["averageCOP"].isna().all()
         ):
-            electric = df_daily_api["totalHpElectric"].replace(0, float("nan"))
-            df_daily_api["averageCOP"] = df_daily_api["totalHpHeat"] / electric
-            df_daily_api["averageCOP"] = df_daily_api["averageCOP"].replace(
-                [float("inf"), -float("inf")], float("nan")
-            )
+            heat = df_daily_api["totalHpHeat"].to_numpy(dtype=np.float64)
+            electric = df_daily_api["totalHpElectric"].to_numpy(dtype=np.float64)
+            cop = np.full_like(heat, np.nan)
+            np.divide(heat, electric, out=cop, where=electric > 0)
+            df_daily_api["averageCOP"] = cop
 
     # === Step 6: Merge — recorder as base, API overwrites recent days ===
     if not df_daily_recorder.empty and not df_daily_api.empty:
-        # API data is more accurate for recent days, so it takes priority
-        df_daily = df_daily_recorder.copy()
-        df_daily.update(df_daily_api)
-        # Add any API-only rows (e.g. today)
-        new_rows = df_daily_api.loc[~df_daily_api.index.isin(df_daily.index)]
-        if not new_rows.empty:
-            df_daily = pd.concat([df_daily, new_rows])
-        df_daily = df_daily.sort_index()
+        # API data is more accurate for recent days, so it takes priority.
+        # One alignment over the union of days: non-NaN API values win,
+        # recorder fills the rest, API-only rows (e.g. today) are included.
+        df_daily = df_daily_api.combine_first(df_daily_recorder)
 
         recorder_only = len(df_daily) - len(df_daily_api)
         _LOGGER.info(
@@ -431,4 +511,4 @@ async def async_fetch_quatt_insights(
     if not df_daily.empty and "totalHeatPerHour" in df_daily.columns:
         df_daily["mode"] = classify_heat_mode(df_daily["totalHeatPerHour"])
 
-    return df_hourly, df_daily
+    return df_hourly, df_daily, daily_avg_temp
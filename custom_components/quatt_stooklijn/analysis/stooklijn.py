@@ -6,6 +6,7 @@ to determine heat pump performance at freezing temperatures.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -27,14 +28,45 @@ from ..const import (
 )
 from .utils import (
     MODE_HEATING,
-    calc_r2,
+    calc_r2_linear,
     classify_heat_mode,
+    linear_fit,
     robust_linear_fit,
     select_heating,
+    states_to_series,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Memoized Quatt-hourly knee detection: {fingerprint: (knee_temp, knee_power)}.
+# The coordinator re-runs the analysis far more often than new hourly data
+# arrives, so an unchanged frame reuses the previous result.
+_knee_memo: dict[tuple, tuple[float | None, float | None]] = {}
+
+
+def clear_knee_memo() -> None:
+    """Drop the memoized Quatt-hourly knee result (e.g. on entry unload)."""
+    _knee_memo.clear()
+
+# Default knee grid (-4…+4 °C in 0.25 °C steps), built once; read-only so a
+# caller can never mutate the shared array
+_KNEE_CANDIDATES_DEFAULT = np.arange(-4.0, 4.0 + 0.125, 0.25)
+_KNEE_CANDIDATES_DEFAULT.setflags(write=False)
+
+# Parsed recorder history per entity: {entity_id: (fetched_until, series)}.
+# Repeated analyses only query the recorder for state changes since the
+# previous fetch; older samples are reused and trimmed to the window.
+_live_history_cache: dict[str, tuple[datetime, pd.Series]] = {}
+# Incremental reads re-read this much before the previous fetch end: the
+# recorder commits in batches, so late-committed states stamped just before
+# it would otherwise never be fetched
+_LIVE_HISTORY_OVERLAP = timedelta(minutes=5)
+
+
+def clear_live_history_cache() -> None:
+    """Drop the cached per-entity recorder history (e.g. on entry unload)."""
+    _live_history_cache.clear()
+
 
 @dataclass
 class StooklijnResult:
@@ -92,28 +124,30 @@ def _filter_stable_hours(df: pd.DataFrame, power_col: str, temp_col: str) -> pd.
         return df
 
     # Filter minimum power
-    df_filtered = df[df[power_col] >= MIN_POWER_FILTER].copy()
+    df_filtered = df[df[power_col] >= MIN_POWER_FILTER]
 
     if len(df_filtered) < 10:
         return df_filtered
 
-    # Calculate rolling statistics to identify stable periods
-    # Use 3-hour window to detect stability
-    df_filtered["power_rolling_std"] = (
-        df_filtered[power_col].rolling(window=3, center=True, min_periods=1).std()
+    # Use 3-hour window to detect stability: sample std (ddof=1) over the
+    # centered window, which shrinks to two points at the edges — same as
+    # rolling(window=3, center=True, min_periods=1).std(), but computed
+    # directly from deviations (no rolling machinery, no cancellation).
+    power = df_filtered[power_col].to_numpy(dtype=np.float64)
+    prev, cur, nxt = power[:-2], power[1:-1], power[2:]
+    mean3 = (prev + cur + nxt) / 3
+    rolling_std = np.empty_like(power)
+    rolling_std[1:-1] = np.sqrt(
+        ((prev - mean3) ** 2 + (cur - mean3) ** 2 + (nxt - mean3) ** 2) / 2
     )
+    rolling_std[0] = abs(power[1] - power[0]) / np.sqrt(2)
+    rolling_std[-1] = abs(power[-1] - power[-2]) / np.sqrt(2)
 
     # Keep hours where power is relatively stable
     # Threshold: std dev should be < 20% of mean power
-    mean_power = df_filtered[power_col].mean()
-    stability_threshold = mean_power * 0.20
+    stability_threshold = power.mean() * 0.20
 
-    df_stable = df_filtered[
-        df_filtered["power_rolling_std"] < stability_threshold
-    ].copy()
-
-    # Drop the helper column
-    df_stable = df_stable.drop(columns=["power_rolling_std"])
+    df_stable = df_filtered[rolling_std < stability_threshold]
 
     _LOGGER.debug(
         "Filtered stable hours: %d → %d (removed %d unstable)",
@@ -149,58 +183,87 @@ def _find_knee_by_grid_search(
     Returns:
         Tuple of (knee_temp, knee_power), or (None, None) if no valid knee found.
     """
-    candidates = np.arange(temp_min, temp_max + step / 2, step)
-    best_temp = None
-    best_power = None
-    best_mse = np.inf
-
-    for knee_t in candidates:
-        left_mask = x_data < knee_t
-        right_mask = x_data >= knee_t
-
-        if left_mask.sum() < min_points_per_segment or right_mask.sum() < min_points_per_segment:
-            continue
-
-        x_left, y_left = x_data[left_mask], y_data[left_mask]
-        x_right, y_right = x_data[right_mask], y_data[right_mask]
-
-        try:
-            slope_l, intercept_l = np.polyfit(x_left, y_left, 1)
-            slope_r, intercept_r = np.polyfit(x_right, y_right, 1)
-        except (np.linalg.LinAlgError, ValueError):
-            continue
-
-        # Physical constraint 1: warm-side slope must be negative.
-        if slope_r >= 0:
-            continue
-
-        # Physical constraint 2: cold-side must be substantially flatter than
-        # warm-side.  Reject splits where the cold side is more than 75 % as
-        # steep as the warm side — that pattern is a gradual slope, not a knee.
-        # (Factor 0.75 is permissive enough for noisy minute-level data while
-        # still rejecting near-straight-line splits.)
-        if slope_l < 0 and abs(slope_l) > abs(slope_r) * 0.75:
-            continue
-
-        pred_left = slope_l * x_left + intercept_l
-        pred_right = slope_r * x_right + intercept_r
+    if (temp_min, temp_max, step) == (-4.0, 4.0, 0.25):
+        candidates = _KNEE_CANDIDATES_DEFAULT
+    else:
+        candidates = np.arange(temp_min, temp_max + step / 2, step)
+
+    # Sort once; each candidate split is then a prefix (x < knee) and suffix
+    # (x >= knee), so per-segment sums come from cumulative sums and every
+    # candidate is fitted at once via the closed-form OLS normal equations.
+    order = np.argsort(x_data, kind="stable")
+    x = np.asarray(x_data, dtype=np.float64)[order]
+    y = np.asarray(y_data, dtype=np.float64)[order]
+    n = x.size
+    k = np.searchsorted(x, candidates, side="left")  # points left of knee
+
+    # Fit in coordinates translated to the overall mean: keeps the squared
+    # sums small (better conditioned) and leaves slopes and SSE unchanged.
+    x_mean, y_mean = x.mean(), y.mean()
+    xc, yc = x - x_mean, y - y_mean
+
+    def _prefix(values: np.ndarray) -> np.ndarray:
+        return np.concatenate(([0.0], np.cumsum(values)))
+
+    cx, cy = _prefix(xc), _prefix(yc)
+    cxx, cxy, cyy = _prefix(xc * xc), _prefix(xc * yc), _prefix(yc * yc)
+
+    def _segment_fit(cnt, sx, sy, sxx, sxy, syy):
+        denom = cnt * sxx - sx * sx
+        # Relative tolerance: all-equal x leaves only rounding noise in denom
+        valid = denom > 1e-12 * cnt * sxx
+        safe = np.where(valid, denom, 1.0)
+        slope = np.where(valid, (cnt * sxy - sx * sy) / safe, np.nan)
+        intercept = (sy - slope * sx) / np.maximum(cnt, 1)
+        sse = syy - slope * sxy - intercept * sy
+        return slope, intercept, sse, valid
+
+    slope_l, intercept_l, sse_l, valid_l = _segment_fit(
+        k, cx[k], cy[k], cxx[k], cxy[k], cyy[k]
+    )
+    slope_r, intercept_r, sse_r, valid_r = _segment_fit(
+        n - k,
+        cx[n] - cx[k],
+        cy[n] - cy[k],
+        cxx[n] - cxx[k],
+        cxy[n] - cxy[k],
+        cyy[n] - cyy[k],
+    )
 
-        # MSE normalised by total points so no segment can dominate by being
-        # artificially tiny (a tiny cold-side segment always fits well; using
-        # per-segment mean would favour putting the knee at the extreme cold end).
-        mse = (
-            np.sum((y_left - pred_left) ** 2) + np.sum((y_right - pred_right) ** 2)
-        ) / (left_mask.sum() + right_mask.sum())
+    ok = (
+        (k >= min_points_per_segment)
+        & (n - k >= min_points_per_segment)
+        & valid_l
+        & valid_r
+    )
+    # Physical constraint 1: warm-side slope must be negative.
+    ok &= slope_r < 0
+    # Physical constraint 2: cold-side must be substantially flatter than
+    # warm-side.  Reject splits where the cold side is more than 75 % as
+    # steep as the warm side — that pattern is a gradual slope, not a knee.
+    # (Factor 0.75 is permissive enough for noisy minute-level data while
+    # still rejecting near-straight-line splits.)
+    ok &= ~((slope_l < 0) & (np.abs(slope_l) > np.abs(slope_r) * 0.75))
+
+    if not ok.any():
+        return None, None
 
-        if mse < best_mse:
-            best_mse = mse
-            best_temp = float(knee_t)
-            power_at_knee = (
-                slope_l * knee_t + intercept_l + slope_r * knee_t + intercept_r
-            ) / 2
-            best_power = float(power_at_knee)
+    # MSE normalised by total points so no segment can dominate by being
+    # artificially tiny (a tiny cold-side segment always fits well; using
+    # per-segment mean would favour putting the knee at the extreme cold end).
+    # Clamp tiny negative SSE from floating-point cancellation on exact fits.
+    mse = np.where(ok, np.maximum(sse_l, 0.0) + np.maximum(sse_r, 0.0), np.inf) / n
+    best = int(np.argmin(mse))
 
-    return best_temp, best_power
+    knee_t = candidates[best]
+    knee_c = knee_t - x_mean
+    power_at_knee = y_mean + (
+        slope_l[best] * knee_c
+        + intercept_l[best]
+        + slope_r[best] * knee_c
+        + intercept_r[best]
+    ) / 2
+    return float(knee_t), float(power_at_knee)
 
 
 def _perform_knee_detection_quatt(df_hourly: pd.DataFrame) -> tuple[float | None, float | None]:
@@ -225,10 +288,32 @@ def _perform_knee_detection_quatt(df_hourly: pd.DataFrame) -> tuple[float | None
     if "hpHeat" not in df_hourly.columns or "temperatureOutside" not in df_hourly.columns:
         return None, None
 
+    # Content hash of the index and both input columns: any changed, added or
+    # removed hour (NaN included) gives a new key
+    key = (
+        len(df_hourly),
+        int(
+            pd.util.hash_pandas_object(
+                df_hourly[["hpHeat", "temperatureOutside"]], index=True
+            ).sum()
+        ),
+    )
+    if key in _knee_memo:
+        _LOGGER.debug("Knee detection (Quatt): hourly data unchanged, reusing result")
+        return _knee_memo[key]
+
+    knee = _detect_knee_quatt(df_hourly)
+    _knee_memo.clear()
+    _knee_memo[key] = knee
+    return knee
+
+
+def _detect_knee_quatt(df_hourly: pd.DataFrame) -> tuple[float | None, float | None]:
+    """Uncached body of _perform_knee_detection_quatt()."""
     # Prepare data
     df_prep = df_hourly[
         (df_hourly["hpHeat"].notna()) & (df_hourly["temperatureOutside"].notna())
-    ].copy()
+    ]
 
     if df_prep.empty:
         return None, None
@@ -292,7 +377,7 @@ def extract_knee_points_from_hourly(
         return {}
 
     mask = (df_hourly["hpHeat"] >= min_power) & (df_hourly["temperatureOutside"] < max_temp)
-    active = df_hourly[mask][["temperatureOutside", "hpHeat"]].copy().dropna()
+    active = df_hourly.loc[mask, ["temperatureOutside", "hpHeat"]].dropna()
 
     if active.empty:
         return {}
@@ -361,6 +446,72 @@ def extract_knee_points_from_recorder(
     return result
 
 
+def _median_per_minute(series: pd.Series, name: str) -> pd.Series:
+    """Collapse state changes to one median value per (naive UTC) minute."""
+    minutes = series.index.floor("min").rename("timestamp")
+    if minutes.is_unique:
+        # Common case (≤1 change per minute): the median is the value itself
+        return series.set_axis(minutes).sort_index().rename(name)
+    return series.groupby(minutes).median().rename(name)
+
+
+async def _async_entity_history(
+    hass: HomeAssistant, entity_id: str, start_dt: datetime, end_dt: datetime
+) -> pd.Series:
+    """Return the parsed state history of one entity for [start_dt, end_dt].
+
+    Incremental: when the previous fetch of this entity ended inside the
+    window, only state changes from shortly before that point
+    (``_LIVE_HISTORY_OVERLAP``) are read from the recorder.
+    """
+    cached = _live_history_cache.get(entity_id)
+    incremental = cached is not None and start_dt <= cached[0] <= end_dt
+    fetch_from = start_dt
+    if incremental:
+        fetch_from = max(start_dt, cached[0] - _LIVE_HISTORY_OVERLAP)
+
+    def _fetch() -> pd.Series:
+        states = state_changes_during_period(
+            hass,
+            fetch_from,
+            end_dt,
+            entity_id,
+            # The state in effect at fetch_from is already cached
+            include_start_time_state=not incremental,
+        )
+        return states_to_series(states.get(entity_id, []))
+
+    series = await get_instance(hass).async_add_executor_job(_fetch)
+
+    if incremental:
+        def _naive_utc(dt: datetime) -> pd.Timestamp:
+            return pd.Timestamp(dt).tz_convert("UTC").tz_localize(None)
+
+        start_ts = _naive_utc(start_dt)
+        fetch_ts = _naive_utc(fetch_from)
+        old = cached[1]
+        # The re-read overlap replaces the cached samples after fetch_from; a
+        # cached state stamped exactly at fetch_from is kept unless re-read
+        at_fetch = old[old.index == fetch_ts]
+        series = pd.concat(
+            [
+                old[(old.index >= start_ts) & (old.index < fetch_ts)],
+                at_fetch[~at_fetch.index.isin(series.index)],
+                series,
+            ]
+        )
+        # Like include_start_time_state on a full fetch: the state in effect
+        # at the window start is kept, stamped at start_dt
+        before = old[old.index < start_ts]
+        if not before.empty and (series.empty or series.index[0] > start_ts):
+            carried = before.iloc[-1:].set_axis(pd.DatetimeIndex([start_ts]))
+            series = pd.concat([carried, series])
+        series = series.rename_axis("timestamp")
+
+    _live_history_cache[entity_id] = (end_dt, series)
+    return series
+
+
 async def async_fetch_live_history(
     hass: HomeAssistant,
     temp_entities: list[str],
@@ -382,60 +533,37 @@ async def async_fetch_live_history(
     end_dt = dt_util.utcnow()
     start_dt = end_dt - timedelta(days=days)
 
-    def _fetch_entity_states(entity_id):
-        """Fetch states for a single entity from recorder."""
-        return state_changes_during_period(
-            hass,
-            start_dt,
-            end_dt,
-            entity_id,
+    # Power and the preferred temperature entity are independent recorder
+    # queries, so run them concurrently; later temperature entities are only
+    # queried when the preferred one has no data.
+    fetches = [_async_entity_history(hass, power_entity, start_dt, end_dt)]
+    if temp_entities:
+        fetches.append(
+            _async_entity_history(hass, temp_entities[0], start_dt, end_dt)
         )
+    power_series, *first_temp = await asyncio.gather(*fetches)
 
     # Find temperature data (first available entity in priority order)
     df_temp = None
-    for temp_entity in temp_entities:
-        states = await get_instance(hass).async_add_executor_job(
-            _fetch_entity_states, temp_entity
-        )
-        entity_states = states.get(temp_entity, [])
-        if entity_states:
-            records = []
-            for s in entity_states:
-                try:
-                    ts = s.last_changed
-                    if ts.tzinfo is not None:
-                        ts = ts.replace(tzinfo=None)
-                    records.append({"timestamp": ts, "temp": float(s.state)})
-                except (ValueError, TypeError):
-                    continue
-            if records:
-                df_t = pd.DataFrame(records)
-                df_t["timestamp"] = pd.to_datetime(df_t["timestamp"]).dt.floor("min")
-                df_temp = df_t.groupby("timestamp")["temp"].median()
-                _LOGGER.info("Using temperature from: %s (%d records)", temp_entity, len(records))
-                break
+    for i, temp_entity in enumerate(temp_entities):
+        if i == 0:
+            temp_series = first_temp[0]
+        else:
+            temp_series = await _async_entity_history(
+                hass, temp_entity, start_dt, end_dt
+            )
+        if not temp_series.empty:
+            df_temp = _median_per_minute(temp_series, "temp")
+            _LOGGER.info(
+                "Using temperature from: %s (%d records)", temp_entity, len(temp_series)
+            )
+            break
 
     # Power data
     df_power = None
-    power_states_dict = await get_instance(hass).async_add_executor_job(
-        _fetch_entity_states, power_entity
-    )
-    power_states = power_states_dict.get(power_entity, [])
-    if power_states:
-        records = []
-        for s in power_states:
-            try:
-                ts = s.last_changed
-                if ts.tzinfo is not None:
-                    ts = ts.replace(tzinfo=None)
-                records.append({"timestamp": ts, "power": float(s.state)})
-            except (ValueError, TypeError):
-                continue
-        if records:
-            df_p = pd.DataFrame(records)
-            df_p["timestamp"] = pd.to_datetime(df_p["timestamp"]).dt.floor("min")
-            df_power = df_p.groupby("timestamp")["power"].median()
-            _LOGGER.info("Power data: %d records from %s", len(records), power_entity)
+    if not power_series.empty:
+        df_power = _median_per_minute(power_series, "power")
+        _LOGGER.info("Power data: %d records from %s", len(power_series), power_entity)
 
     if df_temp is None or df_power is None:
         _LOGGER.warning(
@@ -445,16 +573,26 @@ async def async_fetch_live_history(
         )
         return None
 
-    # Merge on timestamp
-    merged = pd.merge(df_temp, df_power, left_index=True, right_index=True, how="inner")
+    # Merge on timestamp: both indexes are sorted and unique per minute, so an
+    # index intersection (sorted merge) replaces the hash-based pd.merge
+    common = df_temp.index.intersection(df_power.index)
+    merged = pd.DataFrame(
+        {
+            "temp": df_temp.reindex(common).to_numpy(),
+            "power": df_power.reindex(common).to_numpy(),
+        },
+        index=common,
+    )
     _LOGGER.info("Merged live history: %d aligned data points", len(merged))
 
     # Exclude minutes during which an external controller (energy-os) throttled
     # the heat pump — those samples don't reflect the natural heating curve.
     merged.attrs["throttle_excluded_minutes"] = 0
     if throttle_entity:
+        # Full-window fetch: the cap in effect at the window start (start-time
+        # state) is forward-filled, so it must not be trimmed away
         cap_states = await get_instance(hass).async_add_executor_job(
-            _fetch_entity_states, throttle_entity
+            state_changes_during_period, hass, start_dt, end_dt, throttle_entity
         )
         cap_records = []
         for s in cap_states.get(throttle_entity, []):
@@ -540,6 +678,14 @@ def calculate_stooklijn(
     result = StooklijnResult()
     dynamic_min_temp = -0.5  # fallback
 
+    # Active-HP recorder minutes, shared by knee detection (STEP 1) and the
+    # warm-side regression (STEP 1b)
+    df_active = None
+    if df_ha_merged is not None and not df_ha_merged.empty:
+        df_active = df_ha_merged.loc[
+            df_ha_merged["power"] >= MIN_POWER_FILTER, ["temp", "power"]
+        ]
+
     # =========================================================
     # STEP 1: Knee detection (piecewise linear fit)
     # =========================================================
@@ -563,30 +709,33 @@ def calculate_stooklijn(
     knee_detected = False
 
     # --- Primary: HA recorder minute-level data (+ historical store) ---
-    if df_ha_merged is not None and not df_ha_merged.empty:
+    if df_active is not None:
         _LOGGER.info("Attempting knee detection with recorder minute-level data...")
-        valid_mask = (df_ha_merged["power"] >= MIN_POWER_FILTER) & (df_ha_merged["temp"] < 10.0)
-        df_fit_current = df_ha_merged[valid_mask][["temp", "power"]].copy()
+        # Plain arrays from here on: the knee search only needs temp/power
+        temp_arr = df_active["temp"].to_numpy(dtype=np.float64)
+        cold = temp_arr < 10.0
+        x_data = temp_arr[cold]
+        y_data = df_active["power"].to_numpy(dtype=np.float64)[cold]
 
         # Merge with historical knee data from previous analyses so that
         # cold-weather data from earlier winters is included even when the
         # recent 30-day window happens to be mild.
         # Both datasets are filtered to temp < 10°C so mild-weather modulation
         # data cannot bias the knee toward warmer temperatures.
-        df_fit = df_fit_current
         if df_knee_history is not None and not df_knee_history.empty:
-            df_fit = pd.concat([df_fit, df_knee_history], ignore_index=True)
             _LOGGER.info(
                 "Knee detection: %d recorder + %d KneeDataStore points",
-                len(df_fit_current),
+                x_data.size,
                 len(df_knee_history),
             )
+            x_data = np.concatenate(
+                (x_data, df_knee_history["temp"].to_numpy(dtype=np.float64))
+            )
+            y_data = np.concatenate(
+                (y_data, df_knee_history["power"].to_numpy(dtype=np.float64))
+            )
 
-
-        if not df_fit.empty and len(df_fit) > 10:
-            x_data = df_fit["temp"].values
-            y_data = df_fit["power"].values
-
+        if x_data.size > 10:
             knee_temp, knee_power = _find_knee_by_grid_search(x_data, y_data)
 
             if knee_temp is not None:
@@ -598,7 +747,7 @@ def calculate_stooklijn(
                     "Knee detected (recorder+KneeStore+API): %.2f°C, %d W (%d points total)",
                     result.knee_temperature,
                     result.knee_power,
-                    len(df_fit),
+                    x_data.size,
                 )
                 knee_detected = True
             else:
@@ -608,7 +757,7 @@ def calculate_stooklijn(
                     "will try Quatt hourly data",
                     x_data.min(),
                     x_data.max(),
-                    len(df_fit),
+                    x_data.size,
                 )
 
     # --- Fallback: Quatt hourly data (longer history, but defrost-diluted) ---
@@ -654,11 +803,8 @@ def calculate_stooklijn(
     # estimate the current Quatt stooklijn. Minute-level data correctly
     # captures instantaneous power, avoiding the problem where hourly
     # averages of partial operation pass the power filter.
-    if df_ha_merged is not None and not df_ha_merged.empty:
-        valid_mask = df_ha_merged["power"] >= MIN_POWER_FILTER
-        df_fit = df_ha_merged[valid_mask].copy()
-
-        df_right = df_fit[df_fit["temp"] >= dynamic_min_temp][["temp", "power"]]
+    if df_active is not None:
+        df_right = df_active[df_active["temp"] >= dynamic_min_temp]
 
         # Augment the warm-side data with cold-weather points from the
         # KneeDataStore (hourly averages, up to 3 years back).  When the
@@ -691,14 +837,14 @@ def calculate_stooklijn(
                 np.ceil(df_right["temp"].max()) + 1.5,
                 1.0,
             )
-            df_right["_bin"] = pd.cut(df_right["temp"], bins=bin_edges)
             df_binned = (
-                df_right.groupby("_bin", observed=True)[["temp", "power"]]
+                df_right.groupby(
+                    pd.cut(df_right["temp"], bins=bin_edges), observed=True
+                )[["temp", "power"]]
                 .median()
                 .dropna()
                 .reset_index(drop=True)
             )
-            df_right = df_right.drop(columns="_bin")
 
             x_all = df_binned["temp"].values
             y_all = df_binned["power"].values
@@ -728,7 +874,7 @@ def calculate_stooklijn(
                 (df_hourly["hpHeat"] > 100)
                 & (df_hourly["temperatureOutside"] < dynamic_min_temp)
                 & (df_hourly["temperatureOutside"].notna())
-            ].copy()
+            ]
 
             if len(df_filtered) > 5:
                 x = df_filtered["temperatureOutside"].values
@@ -736,25 +882,22 @@ def calculate_stooklijn(
 
                 # Pre-envelope outlier removal (z-score)
                 _, _, env_inlier_mask = robust_linear_fit(x, y)
-                df_clean = df_filtered[env_inlier_mask].copy()
-
-                # Max-envelope filter
-                df_clean["temp_bin"] = (
-                    df_clean["temperatureOutside"] / BIN_SIZE
-                ).round() * BIN_SIZE
-                df_clean["max_in_bin"] = df_clean.groupby("temp_bin")[
-                    "hpHeat"
-                ].transform("max")
-                mask_env = df_clean["hpHeat"] >= (
-                    df_clean["max_in_bin"] * KEEP_THRESHOLD
-                )
-                df_envelope = df_clean[mask_env]
-
-                if len(df_envelope) > 1:
-                    x_env = df_envelope["temperatureOutside"].values
-                    y_env = df_envelope["hpHeat"].values
-                    slope, intercept = np.polyfit(x_env, y_env, 1)
-                    r2 = calc_r2(y_env, slope * x_env + intercept)
+                x_clean = x[env_inlier_mask]
+                y_clean = y[env_inlier_mask]
+
+                # Max-envelope filter: max power per BIN_SIZE temperature bin
+                # via an unbuffered maximum over integer bin indices
+                temp_bin = np.round(x_clean / BIN_SIZE).astype(np.int64)
+                temp_bin -= temp_bin.min()
+                max_in_bin = np.full(temp_bin.max() + 1, -np.inf)
+                np.maximum.at(max_in_bin, temp_bin, y_clean)
+                mask_env = y_clean >= max_in_bin[temp_bin] * KEEP_THRESHOLD
+
+                if mask_env.sum() > 1:
+                    x_env = x_clean[mask_env]
+                    y_env = y_clean[mask_env]
+                    slope, intercept = linear_fit(x_env, y_env)
+                    r2 = calc_r2_linear(x_env, y_env, slope)
 
                     result.slope_local = float(slope)
                     result.intercept_local = float(intercept)
@@ -766,9 +909,11 @@ def calculate_stooklijn(
     if df_daily is not None and not df_daily.empty:
         cols_needed = ["avg_temperatureOutside", "totalHeatPerHour"]
         if all(c in df_daily.columns for c in cols_needed):
-            plot_data = df_daily[cols_needed].replace(
-                [np.inf, -np.inf], np.nan
-            ).dropna()
+            # Finite rows only (drops NaN and ±inf in one mask)
+            finite = np.isfinite(
+                df_daily[cols_needed].to_numpy(dtype=np.float64)
+            ).all(axis=1)
+            plot_data = df_daily.loc[finite, cols_needed]
 
             # Filter out non-heating days (summer/cooling) for regression
             heating_data = select_heating(plot_data)
@@ -785,7 +930,7 @@ def calculate_stooklijn(
 
                 x = x_all[inlier_mask]
                 y = y_all[inlier_mask]
-                r2 = calc_r2(y, slope * x + intercept)
+                r2 = calc_r2_linear(x, y, slope)
 
                 result.slope_optimal = float(slope)
                 result.intercept_optimal = float(intercept)
@@ -794,25 +939,21 @@ def calculate_stooklijn(
                     result.balance_temp_optimal = float(-intercept / slope)
 
                 # Build scatter data for dashboard (only heating days)
-                scatter = []
-                for _, row in heating_data.iterrows():
-                    cop_val = None
-                    if "averageCOP" in df_daily.columns:
-                        idx = row.name if hasattr(row, "name") else None
-                        if idx is not None and idx in df_daily.index:
-                            cop_val = df_daily.loc[idx, "averageCOP"]
-                            if pd.notna(cop_val):
-                                cop_val = float(cop_val)
-                            else:
-                                cop_val = None
-                    scatter.append(
-                        {
-                            "temp": round(float(row["avg_temperatureOutside"]), 1),
-                            "heat": round(float(row["totalHeatPerHour"]), 0),
-                            "cop": cop_val,
-                        }
+                if "averageCOP" in df_daily.columns:
+                    cops = [
+                        None if np.isnan(c) else float(c)
+                        for c in df_daily["averageCOP"]
+                        .reindex(heating_data.index)
+                        .to_numpy(dtype=np.float64)
+                    ]
+                else:
+                    cops = [None] * len(heating_data)
+                result.scatter_data = [
+                    {"temp": t, "heat": h, "cop": c}
+                    for t, h, c in zip(
+                        np.round(x_all, 1).tolist(), np.round(y_all, 0).tolist(), cops
                     )
-                result.scatter_data = scatter
+                ]
 
         # =========================================================
         # STEP 3b: Daily-based Quatt stooklijn estimation
@@ -846,7 +987,7 @@ def calculate_stooklijn(
             if len(df_warm) > 1:
                 x_d = df_warm["avg_temperatureOutside"].values
                 y_d = df_warm["totalHeatPerHour"].values
-                slope_d, intercept_d = np.polyfit(x_d, y_d, 1)
+                slope_d, intercept_d = linear_fit(x_d, y_d)
                 result.slope_api_daily = float(slope_d)
                 result.intercept_api_daily = float(intercept_d)
                 if slope_d != 0:
@@ -863,20 +1004,21 @@ def calculate_stooklijn(
 
         # Build COP scatter data (only heating days with valid COP)
         if "averageCOP" in df_daily.columns and "avg_temperatureOutside" in df_daily.columns:
-            cop_data = df_daily[["avg_temperatureOutside", "averageCOP"]].replace(
-                [np.inf, -np.inf], np.nan
-            ).dropna()
-            # Filter: only days with meaningful COP (heating days)
-            cop_data = cop_data[cop_data["averageCOP"] > 0]
+            cop_cols = ["avg_temperatureOutside", "averageCOP"]
+            cop_arr = df_daily[cop_cols].to_numpy(dtype=np.float64)
+            # Filter: only finite days with meaningful COP (heating days)
+            cop_mask = np.isfinite(cop_arr).all(axis=1) & (cop_arr[:, 1] > 0)
             if "totalHeatPerHour" in df_daily.columns:
-                valid_idx = classify_heat_mode(df_daily["totalHeatPerHour"]) == MODE_HEATING
-                cop_data = cop_data[cop_data.index.isin(df_daily[valid_idx].index)]
+                cop_mask &= (
+                    classify_heat_mode(df_daily["totalHeatPerHour"]) == MODE_HEATING
+                ).to_numpy()
+            cop_data = df_daily.loc[cop_mask, cop_cols]
             result.cop_scatter_data = [
-                {
-                    "temp": round(float(row["avg_temperatureOutside"]), 1),
-                    "cop": round(float(row["averageCOP"]), 2),
-                }
-                for _, row in cop_data.iterrows()
+                {"temp": t, "cop": c}
+                for t, c in zip(
+                    np.round(cop_data["avg_temperatureOutside"].to_numpy(), 1).tolist(),
+                    np.round(cop_data["averageCOP"].to_numpy(), 2).tolist(),
+                )
             ]
 
     return result
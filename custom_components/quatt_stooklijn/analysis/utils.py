@@ -13,6 +13,27 @@ MODE_COOLING = "cooling"
 MODE_IDLE = "idle"
 
 
+def linear_fit(x: np.ndarray, y: np.ndarray) -> tuple[float, float]:
+    """Closed-form ordinary least-squares fit of y = slope·x + intercept.
+
+    Equivalent to ``np.polyfit(x, y, 1)`` but computed from a handful of sums
+    instead of a Vandermonde matrix + SVD. The data is translated to its mean
+    first, so the sums stay well conditioned for raw temperatures and powers.
+    Degenerate input (all x equal) yields a flat line through the mean of y.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x_mean = x.mean()
+    y_mean = y.mean()
+    xc = x - x_mean
+    sxx = xc @ xc
+    if sxx == 0:
+        return 0.0, float(y_mean)
+    slope = (xc @ (y - y_mean)) / sxx
+    intercept = y_mean - slope * x_mean
+    return float(slope), float(intercept)
+
+
 def robust_linear_fit(
     x: np.ndarray,
     y: np.ndarray,
@@ -27,19 +48,24 @@ def robust_linear_fit(
     Returns:
         (slope, intercept, inlier_mask) — mask is boolean array over original x/y.
     """
-    slope_rough, intercept_rough = np.polyfit(x, y, 1)
-    residuals = y - (slope_rough * x + intercept_rough)
-    std = np.std(residuals)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    slope_rough, intercept_rough = linear_fit(x, y)
+    # Residuals built in one buffer (no temporaries for the prediction)
+    residuals = np.multiply(x, -slope_rough)
+    residuals += y
+    residuals -= intercept_rough
+    std = residuals.std()
 
     if std > 0:
-        inlier_mask = np.abs(residuals) < threshold * std
+        inlier_mask = np.abs(residuals, out=residuals) < threshold * std
         if inlier_mask.sum() < min_inliers:
             inlier_mask = np.ones(len(x), dtype=bool)
     else:
         inlier_mask = np.ones(len(x), dtype=bool)
 
-    slope, intercept = np.polyfit(x[inlier_mask], y[inlier_mask], 1)
-    return float(slope), float(intercept), inlier_mask
+    slope, intercept = linear_fit(x[inlier_mask], y[inlier_mask])
+    return slope, intercept, inlier_mask
 
 
 def calc_r2(y_actual: np.ndarray, y_predicted: np.ndarray) -> float:
@@ -49,6 +75,54 @@ def calc_r2(y_actual: np.ndarray, y_predicted: np.ndarray) -> float:
     return float(1 - (ss_res / ss_tot)) if ss_tot > 0 else 0.0
 
 
+def calc_r2_linear(x: np.ndarray, y: np.ndarray, slope: float) -> float:
+    """R² of the least-squares line through (x, y), computed from sums.
+
+    Uses ss_tot = Σ(y−ȳ)² and ss_res = ss_tot − slope·Σ(x−x̄)(y−ȳ), which
+    holds only for the OLS slope of this exact x/y — no prediction array is
+    materialised.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    yc = y - y.mean()
+    ss_tot = yc @ yc
+    if ss_tot <= 0:
+        return 0.0
+    ss_res = ss_tot - slope * ((x - x.mean()) @ yc)
+    return float(1 - ss_res / ss_tot)
+
+
+def daily_mean(series: pd.Series) -> pd.Series:
+    """Mean per calendar day of a DatetimeIndex-ed Series, NaNs ignored.
+
+    Uses ``np.bincount`` on integer day numbers instead of a groupby on
+    ``index.date`` (one Python ``date`` object per row). Tz-aware indexes are
+    bucketed by local wall-clock day. Returns a Series on a naive midnight
+    DatetimeIndex containing only days with at least one valid value.
+    """
+    index = series.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.values.astype("datetime64[D]").astype(np.int64)
+    vals = series.to_numpy(dtype=np.float64)
+
+    valid = ~np.isnan(vals)
+    if not valid.any():
+        return pd.Series(dtype=np.float64, index=pd.DatetimeIndex([]))
+    days = days[valid]
+    vals = vals[valid]
+
+    day0 = days.min()
+    bins = days - day0
+    sums = np.bincount(bins, weights=vals)
+    counts = np.bincount(bins)
+    present = np.flatnonzero(counts)
+    return pd.Series(
+        sums[present] / counts[present],
+        index=pd.DatetimeIndex((day0 + present).astype("datetime64[D]")),
+    )
+
+
 def calc_heat_demand(slope: float, intercept: float, t_outdoor: float) -> float:
     """Calculate heat demand (W) from heat loss model, clamped to ≥ 0."""
     return max(0.0, slope * t_outdoor + intercept)
@@ -82,3 +156,25 @@ def select_heating(df: pd.DataFrame, heat_col: str = "totalHeatPerHour") -> pd.D
     if heat_col not in df.columns:
         return df.iloc[0:0]
     return df[classify_heat_mode(df[heat_col]) == MODE_HEATING]
+
+
+def states_to_series(states: list) -> pd.Series:
+    """Parse recorder states into a float Series on a naive (UTC) DatetimeIndex.
+
+    Non-numeric states (unknown, unavailable) are skipped.
+    """
+    timestamps = []
+    values = []
+    for state in states:
+        try:
+            values.append(float(state.state))
+        except (ValueError, TypeError):
+            continue
+        timestamps.append(state.last_changed)
+
+    index = pd.DatetimeIndex(timestamps, name="timestamp")
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return pd.Series(
+        np.fromiter(values, dtype=np.float64, count=len(values)), index=index
+    )
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any
 
 import pandas as pd
@@ -15,6 +15,8 @@ _LOGGER = logging.getLogger(__name__)
 STORAGE_VERSION = 1
 STORAGE_KEY = "quatt_stooklijn_insights_cache"
 KNEE_STORAGE_KEY = "quatt_stooklijn_knee_data"
+# Coalesce insights cache writes made within this window into one disk write
+SAVE_DELAY = 30
 # Retention: effectively never purge. Cold-weather data is the only anchor
 # that keeps knee detection stable across seasons, and the storage cost is
 # negligible (hourly points below 10 °C, ~6k points per winter).
@@ -30,6 +32,11 @@ class QuattInsightsCache:
         self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
         self._cache: dict[str, dict[str, Any]] = {}
         self._loaded = False
+        # Bumped on every content change so callers can memoize derived data
+        self.generation = 0
+        # ISO date of today, refreshed in should_cache when the day rolls over
+        self._today: date | None = None
+        self._today_str = ""
 
     async def async_load(self) -> None:
         """Load cache from storage."""
@@ -45,13 +52,26 @@ class QuattInsightsCache:
             _LOGGER.info("No existing cache found, starting fresh")
 
         self._loaded = True
+        self.generation += 1
         await self.async_cleanup()
 
     async def async_save(self) -> None:
         """Save cache to storage."""
-        await self._store.async_save({"insights": self._cache})
+        await self._store.async_save(self._data_to_save())
         _LOGGER.debug("Saved insights cache with %d days", len(self._cache))
 
+    def async_delay_save(self, delay: float = SAVE_DELAY) -> None:
+        """Schedule a debounced save; repeated calls within delay write once.
+
+        The Store serializes the data when the write actually happens and
+        flushes pending writes when Home Assistant stops.
+        """
+        self._store.async_delay_save(self._data_to_save, delay)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the payload persisted by the Store."""
+        return {"insights": self._cache}
+
     def get(self, date_str: str) -> dict[str, Any] | None:
         """Get cached data for a specific date.
 
@@ -71,6 +91,7 @@ class QuattInsightsCache:
             data: Insights data to cache
         """
         self._cache[date_str] = data
+        self.generation += 1
         _LOGGER.debug("Cached data for %s", date_str)
 
     def should_cache(self, date_str: str) -> bool:
@@ -85,15 +106,26 @@ class QuattInsightsCache:
         Returns:
             True if this date should be cached
         """
+        today = date.today()
+        if today != self._today:
+            self._today = today
+            self._today_str = today.isoformat()
+
+        # Only cache dates before today: YYYY-MM-DD strings order lexically,
+        # so a shape check plus string compare rejects most input cheaply;
+        # fromisoformat then rejects impossible dates (e.g. 2024-02-31)
+        if not (
+            len(date_str) == 10
+            and date_str[4] == "-"
+            and date_str[7] == "-"
+            and date_str < self._today_str
+        ):
+            return False
         try:
-            date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            today = datetime.now().date()
-
-            # Only cache dates before today
-            return date < today
-
+            date.fromisoformat(date_str)
         except ValueError:
             return False
+        return True
 
     async def async_cleanup(self, days_to_keep: int = 365 * KNEE_YEARS_TO_KEEP) -> None:
         """Remove cache entries older than specified days.
@@ -111,6 +143,7 @@ class QuattInsightsCache:
             del self._cache[date_str]
 
         if to_remove:
+            self.generation += 1
             _LOGGER.info("Removed %d old cache entries", len(to_remove))
             await self.async_save()
 
@@ -120,18 +153,11 @@ class QuattInsightsCache:
         Returns:
             Dictionary with cache statistics
         """
-        if not self._cache:
-            return {
-                "total_days": 0,
-                "oldest_date": None,
-                "newest_date": None,
-            }
-
-        dates = sorted(self._cache.keys())
+        # YYYY-MM-DD keys order lexically; min/max avoid sorting every key
         return {
-            "total_days": len(dates),
-            "oldest_date": dates[0] if dates else None,
-            "newest_date": dates[-1] if dates else None,
+            "total_days": len(self._cache),
+            "oldest_date": min(self._cache, default=None),
+            "newest_date": max(self._cache, default=None),
         }
 
 
@@ -234,12 +260,11 @@ class KneeDataStore:
 
     def get_stats(self) -> dict[str, Any]:
         """Return summary statistics for logging."""
-        dates = sorted(self._days.keys())
         return {
-            "total_days": len(dates),
+            "total_days": len(self._days),
             "total_points": sum(len(v) for v in self._days.values()),
-            "oldest_date": dates[0] if dates else None,
-            "newest_date": dates[-1] if dates else None,
+            "oldest_date": min(self._days, default=None),
+            "newest_date": max(self._days, default=None),
         }
 
     async def _async_cleanup(self) -> None:
@@ -45,6 +45,8 @@ RECORDER_BOILER_HEAT_ENTITY = "sensor.heatpump_boiler_heat_power"
 
 # How many days of detailed hourly data to fetch from Quatt API
 API_FETCH_DAYS = 30
+# Maximum number of concurrent per-day Quatt API calls
+API_MAX_CONCURRENT_CALLS = 8
 
 # Analysis parameters
 MIN_POWER_FILTER = 2500  # W - minimum power to consider heat pump active
@@ -93,7 +93,7 @@ class QuattStooklijnCoordinator(DataUpdateCoordinator[QuattStooklijnData]):
         # Step 1: Fetch Quatt insights data (hybrid: recorder + API)
         _LOGGER.info("Fetching Quatt insights data...")
         temp_entities = config.get(CONF_TEMP_ENTITIES, [])
-        df_hourly, df_daily = await async_fetch_quatt_insights(
+        df_hourly, df_daily, daily_avg_temp = await async_fetch_quatt_insights(
             self.hass,
             config[CONF_QUATT_START_DATE],
             date.today().isoformat(),
@@ -117,6 +117,7 @@ class QuattStooklijnCoordinator(DataUpdateCoordinator[QuattStooklijnData]):
                 ),
                 df_hourly if not df_hourly.empty else None,
                 temp_entities=config.get(CONF_TEMP_ENTITIES),
+                daily_temp_hp=daily_avg_temp,
             )
 
         # Step 3: Fetch live history for knee detection
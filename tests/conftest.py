@@ -38,6 +38,8 @@ def _stub_ha():
     _ensure_module("homeassistant.helpers.aiohttp_client")
     _ensure_module("homeassistant.helpers.restore_state")
     _ensure_module("homeassistant.helpers.storage")
+    _ensure_module("homeassistant.helpers.config_validation")
+    _ensure_module("homeassistant.helpers.typing")
     _ensure_module("homeassistant.components")
     _ensure_module("homeassistant.components.binary_sensor")
     _ensure_module("homeassistant.components.sensor")
@@ -55,6 +57,7 @@ def _stub_ha():
     import enum
     const_mod = sys.modules["homeassistant.const"]
     const_mod.EntityCategory = enum.Enum("EntityCategory", ["DIAGNOSTIC", "CONFIG"])
+    const_mod.EVENT_HOMEASSISTANT_STARTED = "homeassistant_started"
 
     # Provide key classes/sentinels
     core = sys.modules["homeassistant.core"]
@@ -134,6 +137,11 @@ def _stub_ha():
         {"__class_getitem__": classmethod(lambda cls, item: cls)},
     )
 
+    # Config validation / typing
+    cv_mod = sys.modules["homeassistant.helpers.config_validation"]
+    cv_mod.config_entry_only_config_schema = lambda domain: None
+    sys.modules["homeassistant.helpers.typing"].ConfigType = dict
+
     # Entity platform
     ep = sys.modules["homeassistant.helpers.entity_platform"]
     ep.AddEntitiesCallback = MagicMock
@@ -203,6 +211,48 @@ from custom_components.quatt_stooklijn.const import (
 )
 
 
+# ---------------------------------------------------------------------------
+# Fixtures — recorder
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def mock_recorder(monkeypatch):
+    """Point ``module.get_instance`` at a recorder stub running jobs inline.
+
+    Usage: ``instance = mock_recorder(stooklijn)``. Each executor job runs after
+    ``instance.delay`` seconds; ``instance.peak`` is the maximum number of jobs
+    in flight and ``instance.results`` collects the job return values.
+    """
+    import asyncio
+
+    instance = MagicMock()
+    instance.delay = 0.0
+    instance.active = 0
+    instance.peak = 0
+    instance.results = []
+
+    async def _job(func, *args):
+        instance.active += 1
+        instance.peak = max(instance.peak, instance.active)
+        try:
+            if instance.delay:
+                await asyncio.sleep(instance.delay)
+            result = func(*args)
+        finally:
+            instance.active -= 1
+        instance.results.append(result)
+        return result
+
+    instance.async_add_executor_job = _job
+
+    def _patch(module):
+        monkeypatch.setattr(module, "get_instance", lambda hass: instance)
+        return instance
+
+    return _patch
+
+
 # ---------------------------------------------------------------------------
 # Fixtures — synthetic data generators
 # ---------------------------------------------------------------------------
@@ -315,5 +365,3 @@ def mock_config():
         CONF_POWER_ENTITY: "sensor.hp_power",
         CONF_GAS_ENABLED: False,
     }
-
-
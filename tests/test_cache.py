@@ -0,0 +1,90 @@
+"""Unit tests for the insights cache helper."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from custom_components.quatt_stooklijn.cache import KneeDataStore, QuattInsightsCache
+
+
+class TestShouldCache:
+    """Tests for QuattInsightsCache.should_cache."""
+
+    def test_only_completed_days(self):
+        cache = QuattInsightsCache(None)
+        today = date.today()
+
+        assert cache.should_cache((today - timedelta(days=1)).isoformat())
+        assert cache.should_cache("2020-01-31")
+        assert not cache.should_cache(today.isoformat())
+        assert not cache.should_cache((today + timedelta(days=1)).isoformat())
+
+    def test_malformed_dates_rejected(self):
+        cache = QuattInsightsCache(None)
+
+        for bad in (
+            "",
+            "2020-1-31",
+            "2020/01/31",
+            "20-01-2020",
+            "abcd-ef-gh",
+            "2020-01-31T00",
+            "2024-13-45",
+            "2024-02-31",
+            "2023-02-29",
+            "2024-00-10",
+        ):
+            assert not cache.should_cache(bad)
+        assert cache.should_cache("2024-02-29")
+
+    def test_today_refreshed_on_rollover(self, monkeypatch):
+        from custom_components.quatt_stooklijn import cache as cache_mod
+
+        class _FakeDate(date):
+            current = date(2024, 3, 1)
+
+            @classmethod
+            def today(cls):
+                return cls.current
+
+        monkeypatch.setattr(cache_mod, "date", _FakeDate)
+        cache = QuattInsightsCache(None)
+
+        assert not cache.should_cache("2024-03-01")
+        _FakeDate.current = date(2024, 3, 2)
+        assert cache.should_cache("2024-03-01")
+
+
+class TestGetStats:
+    """Tests for QuattInsightsCache.get_stats."""
+
+    def test_empty(self):
+        assert QuattInsightsCache(None).get_stats() == {
+            "total_days": 0,
+            "oldest_date": None,
+            "newest_date": None,
+        }
+
+    def test_oldest_and_newest(self):
+        cache = QuattInsightsCache(None)
+        for date_str in ("2024-02-10", "2023-12-31", "2024-01-05"):
+            cache.set(date_str, {})
+
+        assert cache.get_stats() == {
+            "total_days": 3,
+            "oldest_date": "2023-12-31",
+            "newest_date": "2024-02-10",
+        }
+
+    def test_knee_store_oldest_and_newest(self):
+        store = KneeDataStore(None)
+        assert store.get_stats()["oldest_date"] is None
+
+        store.merge_days({"2024-02-10": [[1.0, 3000.0]], "2023-12-31": [[-2.0, 4000.0]]})
+
+        assert store.get_stats() == {
+            "total_days": 2,
+            "total_points": 2,
+            "oldest_date": "2023-12-31",
+            "newest_date": "2024-02-10",
+        }
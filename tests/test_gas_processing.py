@@ -1,7 +1,8 @@
 """Unit tests for gas consumption analysis logic.
 
 Since async_fetch_gas_data requires HA (recorder), we test the
-computational steps by simulating the intermediate DataFrames.
+computational steps by simulating the intermediate DataFrames; the recorder
+fetch itself is tested against stubbed recorder calls.
 """
 
 from __future__ import annotations
@@ -233,3 +234,169 @@ class TestHotWaterCorrection:
         assert "totalHeatPerHour" in result.columns
         expected = 3 * 9.77 * 0.9 * 1000 / 24
         assert result["totalHeatPerHour"].iloc[0] == pytest.approx(expected, abs=1)
+
+
+class TestStatsToSeries:
+    """Test converting hourly recorder statistics into a cumulative series."""
+
+    def test_rows_to_naive_hourly_index(self):
+        from custom_components.quatt_stooklijn.analysis.gas import _stats_to_series
+
+        base = pd.Timestamp("2024-01-01 00:00", tz="UTC").timestamp()
+        rows = [
+            {"start": base, "sum": 10.0},
+            {"start": base + 3600, "sum": None},
+            {"start": base + 7200, "sum": 10.8},
+        ]
+        series = _stats_to_series(rows)
+
+        assert list(series) == [10.0, 10.8]
+        assert series.index.tz is None
+        assert series.index[1] == pd.Timestamp("2024-01-01 02:00")
+
+    def test_no_rows(self):
+        from custom_components.quatt_stooklijn.analysis.gas import _stats_to_series
+
+        assert _stats_to_series([]).empty
+
+
+class TestFetchGasData:
+    """Tests for the recorder fetch in async_fetch_gas_data()."""
+
+    @staticmethod
+    def _patch(monkeypatch, mock_recorder, stats, states):
+        from datetime import timezone
+
+        from homeassistant.util import dt as dt_util
+
+        from custom_components.quatt_stooklijn.analysis import gas
+
+        queried = []
+
+        def _changes(hass, start, end, entity_id):
+            queried.append(entity_id)
+            return {entity_id: states[entity_id]} if entity_id in states else {}
+
+        mock_recorder(gas)
+        monkeypatch.setattr(gas, "statistics_during_period", lambda hass, **kw: stats)
+        monkeypatch.setattr(gas, "state_changes_during_period", _changes)
+        monkeypatch.setattr(
+            dt_util, "get_time_zone", lambda name: timezone.utc, raising=False
+        )
+        monkeypatch.setattr(
+            dt_util, "as_utc", lambda d: d.astimezone(timezone.utc), raising=False
+        )
+        return gas, queried
+
+    @staticmethod
+    def _state(value, hour, day=1):
+        from datetime import datetime, timezone
+        from types import SimpleNamespace
+
+        ts = datetime(2024, 1, day, hour, tzinfo=timezone.utc)
+        return SimpleNamespace(state=value, last_changed=ts)
+
+    async def test_statistics_first_and_preferred_temperature(self, monkeypatch, mock_recorder):
+        """Hourly statistic sums are used; only the preferred temp is queried."""
+        from unittest.mock import MagicMock
+
+        base = pd.Timestamp("2024-01-01 00:00", tz="UTC").timestamp()
+        stats = {
+            "sensor.gas": [
+                {"start": base + 3600 * i, "sum": 10.0 + 0.5 * i} for i in range(4)
+            ]
+        }
+        states = {
+            "sensor.temp": [self._state("5.0", 1), self._state("7.0", 2)],
+            "sensor.temp_backup": [self._state("1.0", 1)],
+        }
+        gas, queried = self._patch(monkeypatch, mock_recorder, stats, states)
+
+        df_hourly, df_daily = await gas.async_fetch_gas_data(
+            MagicMock(),
+            "sensor.gas",
+            "2024-01-01",
+            "2024-01-01",
+            temp_entities=["sensor.temp", "sensor.temp_backup"],
+        )
+
+        assert queried == ["sensor.temp"]
+        assert list(df_hourly["gas_m3"]) == [0.5, 0.5, 0.5]
+        assert df_daily["gas_m3"].iloc[0] == pytest.approx(1.5)
+        assert df_daily["avg_temperatureOutside"].iloc[0] == pytest.approx(6.0)
+
+    async def test_state_changes_fallback_without_statistics(self, monkeypatch, mock_recorder):
+        """A meter without long-term statistics falls back to state changes."""
+        from unittest.mock import MagicMock
+
+        states = {
+            "sensor.gas": [
+                self._state("10.0", 0),
+                self._state("unavailable", 1),
+                self._state("11.0", 2),
+            ],
+            "sensor.temp_backup": [self._state("3.0", 1)],
+        }
+        gas, queried = self._patch(monkeypatch, mock_recorder, {}, states)
+
+        _, df_daily = await gas.async_fetch_gas_data(
+            MagicMock(),
+            "sensor.gas",
+            "2024-01-01",
+            "2024-01-01",
+            temp_entities=["sensor.temp", "sensor.temp_backup"],
+        )
+
+        assert queried == ["sensor.gas", "sensor.temp", "sensor.temp_backup"]
+        assert df_daily["gas_m3"].iloc[0] == pytest.approx(1.0)
+        assert df_daily["avg_temperatureOutside"].iloc[0] == pytest.approx(3.0)
+
+    async def test_hot_water_correction(self, monkeypatch, mock_recorder):
+        """With ≥3 warm days their median usage is subtracted as hot water."""
+        from unittest.mock import MagicMock
+
+        base = pd.Timestamp("2024-01-01 00:00", tz="UTC").timestamp()
+        # Daily meter deltas for Jan 2..6 (Jan 1 is the first reading)
+        sums = np.cumsum([10.0, 3.0, 4.0, 0.5, 0.6, 0.4])
+        stats = {
+            "sensor.gas": [
+                {"start": base + 86400 * i, "sum": float(v)} for i, v in enumerate(sums)
+            ]
+        }
+        temps = {2: "5.0", 3: "5.0", 4: "20.0", 5: "20.0", 6: "20.0"}
+        states = {
+            "sensor.temp": [self._state(v, 1, day=d) for d, v in temps.items()],
+        }
+        gas, _ = self._patch(monkeypatch, mock_recorder, stats, states)
+
+        _, df_daily = await gas.async_fetch_gas_data(
+            MagicMock(),
+            "sensor.gas",
+            "2024-01-01",
+            "2024-01-06",
+            temp_entities=["sensor.temp"],
+        )
+
+        assert df_daily["gas_m3_hot_water"].iloc[0] == pytest.approx(0.5)
+        assert list(df_daily["gas_m3_heating"]) == pytest.approx(
+            [2.5, 3.5, 0.0, 0.1, 0.0]
+        )
+        expected = 2.5 * 9.77 * 0.9 * 1000 / 24
+        assert df_daily["totalHeatPerHour"].iloc[0] == pytest.approx(expected)
+
+    async def test_no_gas_data(self, monkeypatch, mock_recorder):
+        """Without statistics or states the result is empty; temps are skipped."""
+        from unittest.mock import MagicMock
+
+        gas, queried = self._patch(monkeypatch, mock_recorder, {}, {})
+
+        df_hourly, df_daily = await gas.async_fetch_gas_data(
+            MagicMock(),
+            "sensor.gas",
+            "2024-01-01",
+            "2024-01-01",
+            temp_entities=["sensor.temp"],
+        )
+
+        assert df_hourly.empty and df_daily.empty
+        assert queried == ["sensor.gas"]
@@ -59,6 +59,47 @@ class TestCalculateHeatLoss:
         # At 15°C the regression would predict negative → should be clipped to 0
         assert result.heat_at_temps[15]["heat"] >= 0
 
+    def test_heat_at_temps_interpolates_cop(self):
+        """COP at each grid temperature is interpolated from daily COP data."""
+        temps = np.linspace(-5, 12, 20)
+        df = pd.DataFrame({
+            "avg_temperatureOutside": temps,
+            "totalHeatPerHour": -200 * temps + 4000,
+            "averageCOP": 3 + 0.1 * temps,
+        })
+        df.index = pd.date_range("2024-01-01", periods=len(df), freq="D")
+
+        result = calculate_heat_loss(df)
+
+        assert result.heat_at_temps[0]["cop"] == pytest.approx(3.0)
+        assert result.heat_at_temps[10]["cop"] == pytest.approx(4.0)
+        # Outside the data range np.interp clamps to the edge values
+        assert result.heat_at_temps[-10]["cop"] == pytest.approx(2.5)
+
+    def test_heat_at_temps_cop_skips_non_finite_unsorted(self):
+        """COP interpolation ignores NaN/inf days and sorts by temperature."""
+        temps = np.linspace(12, -5, 20)
+        cop = 3 + 0.1 * temps
+        cop[2] = np.inf
+        cop[5] = np.nan
+        df = pd.DataFrame({
+            "avg_temperatureOutside": temps,
+            "totalHeatPerHour": -200 * temps + 4000,
+            "averageCOP": cop,
+        })
+        df.index = pd.date_range("2024-01-01", periods=len(df), freq="D")
+
+        result = calculate_heat_loss(df)
+
+        assert result.heat_at_temps[0]["cop"] == pytest.approx(3.0)
+        assert result.heat_at_temps[10]["cop"] == pytest.approx(4.0)
+
+    def test_heat_at_temps_without_cop(self, daily_heating_df):
+        """Without averageCOP data the COP entries are None."""
+        result = calculate_heat_loss(daily_heating_df)
+
+        assert all(v["cop"] is None for v in result.heat_at_temps.values())
+
     def test_empty_dataframe(self):
         """Empty DataFrame should return empty result."""
         result = calculate_heat_loss(pd.DataFrame())
@@ -0,0 +1,114 @@
+"""Tests for integration setup (service registration, startup analysis)."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+
+from custom_components.quatt_stooklijn import (
+    _schedule_startup_analysis,
+    async_setup,
+    async_unload_entry,
+)
+from custom_components.quatt_stooklijn.const import (
+    DOMAIN,
+    SERVICE_CLEAR_DATA,
+    SERVICE_RUN_ANALYSIS,
+)
+
+
+def _make_hass():
+    hass = MagicMock()
+    hass.data = {}
+    hass.services.async_register = MagicMock()
+    hass.services.async_remove = MagicMock()
+    hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+    return hass
+
+
+class TestServiceRegistration:
+    """Services live for the integration lifetime, not per config entry."""
+
+    async def test_async_setup_registers_services(self):
+        hass = _make_hass()
+
+        assert await async_setup(hass, {}) is True
+
+        registered = {c.args[1] for c in hass.services.async_register.call_args_list}
+        assert registered == {SERVICE_RUN_ANALYSIS, SERVICE_CLEAR_DATA}
+        assert hass.data[DOMAIN] == {}
+
+    async def test_unload_last_entry_keeps_services(self):
+        hass = _make_hass()
+        await async_setup(hass, {})
+        entry = MagicMock(entry_id="abc")
+        hass.data[DOMAIN]["abc"] = object()
+
+        assert await async_unload_entry(hass, entry) is True
+
+        assert hass.data[DOMAIN] == {}
+        hass.services.async_remove.assert_not_called()
+
+    async def test_unload_clears_module_caches(self, monkeypatch):
+        from custom_components.quatt_stooklijn.analysis import quatt, stooklijn
+
+        monkeypatch.setattr(stooklijn, "_live_history_cache", {"sensor.old": object()})
+        monkeypatch.setattr(quatt, "_history_memo", {("a", "b"): object()})
+        monkeypatch.setattr(stooklijn, "_knee_memo", {(1, 2): object()})
+        hass = _make_hass()
+        await async_setup(hass, {})
+        hass.data[DOMAIN]["abc"] = object()
+
+        assert await async_unload_entry(hass, MagicMock(entry_id="abc")) is True
+
+        assert stooklijn._live_history_cache == {}
+        assert quatt._history_memo == {}
+        assert stooklijn._knee_memo == {}
+
+
+class TestStartupAnalysis:
+    """The startup analysis must wait until HA has fully started."""
+
+    def _setup(self, is_running):
+        hass = _make_hass()
+        hass.is_running = is_running
+        entry = MagicMock()
+        coordinator = MagicMock()
+        coordinator.async_request_refresh = MagicMock(return_value="refresh")
+        _schedule_startup_analysis(hass, entry, coordinator)
+        return hass, entry, coordinator
+
+    def test_runs_immediately_when_ha_running(self):
+        hass, entry, coordinator = self._setup(is_running=True)
+
+        entry.async_create_background_task.assert_called_once_with(
+            hass, "refresh", "quatt_stooklijn_startup_analysis"
+        )
+        assert coordinator.data.analysis_status == "running"
+        hass.bus.async_listen_once.assert_not_called()
+
+    def test_deferred_until_started_on_cold_boot(self):
+        hass, entry, _ = self._setup(is_running=False)
+
+        entry.async_create_background_task.assert_not_called()
+        event, listener = hass.bus.async_listen_once.call_args.args
+        assert event == EVENT_HOMEASSISTANT_STARTED
+
+        listener(MagicMock())
+
+        entry.async_create_background_task.assert_called_once()
+
+    def test_unload_cancels_only_pending_listener(self):
+        hass, entry, _ = self._setup(is_running=False)
+        cancel = hass.bus.async_listen_once.return_value
+        listener = hass.bus.async_listen_once.call_args.args[1]
+        cancel_if_pending = entry.async_on_unload.call_args.args[0]
+
+        listener(MagicMock())
+        cancel_if_pending()
+        cancel.assert_not_called()
+
+        hass, entry, _ = self._setup(is_running=False)
+        entry.async_on_unload.call_args.args[0]()
+        hass.bus.async_listen_once.return_value.assert_called_once()
@@ -0,0 +1,396 @@
+"""Unit tests for Quatt insights fetching (API/cache day loop)."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from custom_components.quatt_stooklijn.analysis.quatt import _async_fetch_api_days
+
+
+class _FakeCache:
+    """Minimal in-memory stand-in for QuattInsightsCache."""
+
+    def __init__(self, data: dict | None = None) -> None:
+        self.data = dict(data or {})
+        self.generation = 0
+        self.lookups: list[str] = []
+        self.saves = 0
+
+    def get(self, date_str):
+        self.lookups.append(date_str)
+        return self.data.get(date_str)
+
+    def set(self, date_str, value):
+        self.data[date_str] = value
+        self.generation += 1
+
+    def should_cache(self, date_str):
+        return True
+
+    def get_stats(self):
+        return {"total_days": len(self.data)}
+
+    def async_delay_save(self, delay=None):
+        self.saves += 1
+
+
+def _day_payload(date_str: str, temp: float = 5.0) -> dict:
+    return {
+        "totalHpHeat": 24000,
+        "totalHpElectric": 6000,
+        "graph": [{"timestamp": f"{date_str}T00:00:00", "hpHeat": 1000}],
+        "outsideTemperatureGraph": [
+            {"timestamp": f"{date_str}T00:00:00", "temperatureOutside": temp}
+        ],
+    }
+
+
+def _make_hass(delay: float = 0.0, fail_dates: tuple[str, ...] = ()):
+    hass = MagicMock()
+    hass.services.has_service = MagicMock(return_value=True)
+    state = {"active": 0, "peak": 0, "calls": []}
+
+    async def _async_call(domain, service, data, **kwargs):
+        state["calls"].append(data["from_date"])
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(delay)
+            if data["from_date"] in fail_dates:
+                raise RuntimeError("boom")
+            return {"service_response": _day_payload(data["from_date"])}
+        finally:
+            state["active"] -= 1
+
+    hass.services.async_call = _async_call
+    return hass, state
+
+
+class TestFetchApiDays:
+    """Tests for _async_fetch_api_days()."""
+
+    async def test_calls_run_concurrently_and_bounded(self):
+        """API calls overlap, but never exceed API_MAX_CONCURRENT_CALLS."""
+        from custom_components.quatt_stooklijn.const import API_MAX_CONCURRENT_CALLS
+
+        hass, state = _make_hass(delay=0.01)
+        hourly, daily, api_calls, cache_hits = await _async_fetch_api_days(
+            hass, datetime(2024, 1, 1), datetime(2024, 1, 20), _FakeCache()
+        )
+
+        assert api_calls == 20
+        assert cache_hits == 0
+        assert 1 < state["peak"] <= API_MAX_CONCURRENT_CALLS
+        # Output stays in date order regardless of completion order
+        assert [r["date"].day for r in daily] == list(range(1, 21))
+        assert len(hourly) == 20
+
+    async def test_cache_hits_and_failures(self):
+        """Cached days skip the API; a failing day is dropped, not fatal."""
+        cache = _FakeCache({"2024-01-01": _day_payload("2024-01-01")})
+        hass, state = _make_hass(fail_dates=("2024-01-02",))
+
+        _, daily, api_calls, cache_hits = await _async_fetch_api_days(
+            hass, datetime(2024, 1, 1), datetime(2024, 1, 3), cache
+        )
+
+        assert cache_hits == 1
+        assert api_calls == 1
+        assert "2024-01-01" not in state["calls"]
+        assert [r["date"].day for r in daily] == [1, 3]
+
+    async def test_cache_only_makes_no_calls(self):
+        hass, state = _make_hass()
+        _, daily, api_calls, _ = await _async_fetch_api_days(
+            hass, datetime(2024, 1, 1), datetime(2024, 1, 3), _FakeCache(),
+            cache_only=True,
+        )
+
+        assert state["calls"] == []
+        assert api_calls == 0
+        assert daily == []
+
+    async def test_hourly_graphs_joined_on_timestamp(self):
+        """Temperature graphs are aligned onto the main graph by timestamp."""
+        hass, _ = _make_hass()
+        hourly, _, _, _ = await _async_fetch_api_days(
+            hass, datetime(2024, 1, 1), datetime(2024, 1, 1), _FakeCache()
+        )
+
+        assert hourly == [
+            {
+                "timestamp": "2024-01-01T00:00:00",
+                "hpHeat": 1000,
+                "temperatureOutside": 5.0,
+            }
+        ]
+
+    async def test_hourly_merge_does_not_mutate_cache(self):
+        """Merging graphs must not write temperature into cached graph points."""
+        cache = _FakeCache({"2024-01-01": _day_payload("2024-01-01")})
+        hass, _ = _make_hass()
+        await _async_fetch_api_days(
+            hass, datetime(2024, 1, 1), datetime(2024, 1, 1), cache
+        )
+
+        assert "temperatureOutside" not in cache.data["2024-01-01"]["graph"][0]
+
+
+class TestFetchRecorderDaily:
+    """Tests for _async_fetch_recorder_daily()."""
+
+    async def test_cop_zero_when_no_electric(self, monkeypatch, mock_recorder):
+        """COP is heat/electric, and 0 (not inf/NaN) on days without input power."""
+        from datetime import timezone
+
+        from custom_components.quatt_stooklijn.analysis import quatt
+        from custom_components.quatt_stooklijn.const import (
+            RECORDER_POWER_INPUT_ENTITY,
+        )
+
+        day1 = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+        day2 = datetime(2024, 1, 2, tzinfo=timezone.utc).timestamp()
+        stats = {
+            "sensor.power": [
+                {"start": day1, "mean": 1000.0},
+                {"start": day2, "mean": 500.0},
+            ],
+            RECORDER_POWER_INPUT_ENTITY: [
+                {"start": day1, "mean": 250.0},
+                {"start": day2, "mean": 0.0},
+            ],
+            "sensor.temp": [
+                {"start": day1, "mean": 3.5},
+                {"start": day2, "mean": -1.0},
+            ],
+        }
+
+        mock_recorder(quatt)
+        monkeypatch.setattr(quatt, "statistics_during_period", lambda hass, **kw: stats)
+        monkeypatch.setattr(quatt.dt_util, "as_utc", lambda d: d, raising=False)
+        monkeypatch.setattr(
+            quatt.dt_util,
+            "utc_from_timestamp",
+            lambda ts: datetime.fromtimestamp(ts, tz=timezone.utc),
+            raising=False,
+        )
+
+        df = await quatt._async_fetch_recorder_daily(
+            MagicMock(), "2024-01-01", "2024-01-02", "sensor.power", "sensor.temp"
+        )
+
+        assert list(df["averageCOP"]) == [4.0, 0.0]
+        assert list(df.index.day) == [1, 2]
+        assert list(df["totalHpHeat"]) == [24000.0, 12000.0]
+        # Temperature is a plain mean, not scaled to a daily total
+        assert list(df["avg_temperatureOutside"]) == [3.5, -1.0]
+        # Sensor without statistics is filled with 0
+        assert list(df["totalBoilerHeat"]) == [0.0, 0.0]
+
+    async def test_frame_built_in_executor(self, monkeypatch, mock_recorder):
+        """The executor job returns the finished DataFrame, not raw stats."""
+        import pandas as pd
+
+        from custom_components.quatt_stooklijn.analysis import quatt
+
+        instance = mock_recorder(quatt)
+        monkeypatch.setattr(quatt, "statistics_during_period", lambda hass, **kw: {})
+        monkeypatch.setattr(quatt.dt_util, "as_utc", lambda d: d, raising=False)
+
+        df = await quatt._async_fetch_recorder_daily(
+            MagicMock(), "2024-01-01", "2024-01-02", "sensor.power", "sensor.temp"
+        )
+
+        assert df.empty
+        assert len(instance.results) == 1 and isinstance(instance.results[0], pd.DataFrame)
+
+
+class TestFetchQuattInsights:
+    """Tests for the hybrid async_fetch_quatt_insights() pipeline."""
+
+    @staticmethod
+    def _patch(monkeypatch, cache, df_recorder):
+        from custom_components.quatt_stooklijn.analysis import quatt
+
+        async def _get_cache(hass):
+            return cache
+
+        async def _recorder(*args, **kwargs):
+            return df_recorder
+
+        monkeypatch.setattr(quatt, "_get_cache", _get_cache)
+        monkeypatch.setattr(quatt, "_async_fetch_recorder_daily", _recorder)
+        monkeypatch.setattr(quatt, "_history_memo", {})
+        return quatt
+
+    async def test_api_days_merged_over_recorder(self, monkeypatch):
+        """API days overwrite recorder days; hourly temps give the daily mean."""
+        import pandas as pd
+
+        df_recorder = pd.DataFrame(
+            {
+                "totalHpHeat": [1000.0, 2000.0],
+                "totalHpElectric": [500.0, 500.0],
+                "totalBoilerHeat": [0.0, 0.0],
+                "avg_temperatureOutside": [1.0, 2.0],
+            },
+            index=pd.to_datetime(["2024-01-01", "2024-01-02"]),
+        )
+        cache = _FakeCache(
+            {
+                "2024-01-02": _day_payload("2024-01-02", temp=7.0),
+                "2024-01-03": _day_payload("2024-01-03", temp=9.0),
+            }
+        )
+        quatt = self._patch(monkeypatch, cache, df_recorder)
+        hass, state = _make_hass(fail_dates=("2024-01-01",))
+
+        df_hourly, df_daily, daily_avg_temp = await quatt.async_fetch_quatt_insights(
+            hass, "2024-01-01", "2024-01-03"
+        )
+
+        assert list(df_daily.index.day) == [1, 2, 3]
+        assert list(df_daily["totalHpHeat"]) == [1000.0, 24000.0, 24000.0]
+        assert list(df_daily["avg_temperatureOutside"]) == [1.0, 7.0, 9.0]
+        assert df_daily["averageCOP"].iloc[2] == 4.0
+        assert df_hourly.index.name == "timestamp"
+        assert isinstance(df_hourly.index, pd.DatetimeIndex)
+        assert "timestamp" not in df_hourly.columns
+        assert list(daily_avg_temp) == [7.0, 9.0]
+        # 2024-01-01 is not cached → API attempted (fails, recorder value kept)
+        assert state["calls"] == ["2024-01-01"]
+
+    async def test_api_daily_columns_are_float64(self, monkeypatch):
+        """Missing averageCOP (None) still yields numeric columns."""
+        import pandas as pd
+
+        payload = _day_payload("2024-01-02")
+        payload["averageCOP"] = None
+        cache = _FakeCache({"2024-01-02": payload})
+        quatt = self._patch(monkeypatch, cache, pd.DataFrame())
+        hass, _ = _make_hass(fail_dates=("2024-01-03",))
+
+        _, df_daily, _ = await quatt.async_fetch_quatt_insights(
+            hass, "2024-01-02", "2024-01-03"
+        )
+
+        for col in ("totalHpHeat", "totalBoilerGas", "averageCOP"):
+            assert df_daily[col].dtype == "float64"
+        assert df_daily["averageCOP"].iloc[0] == 4.0
+
+    async def test_duplicate_hours_keep_last_and_sorted(self, monkeypatch):
+        """An hour reported by two days keeps the later day's value."""
+        import pandas as pd
+
+        day1 = _day_payload("2024-01-01")
+        day2 = _day_payload("2024-01-02")
+        day2["graph"] = [
+            {"timestamp": "2024-01-02T00:00:00", "hpHeat": 3000},
+            {"timestamp": "2024-01-01T00:00:00", "hpHeat": 2000},
+        ]
+        cache = _FakeCache({"2024-01-01": day1, "2024-01-02": day2})
+        quatt = self._patch(monkeypatch, cache, pd.DataFrame())
+        hass, _ = _make_hass(fail_dates=("2024-01-03",))
+
+        df_hourly, _, _ = await quatt.async_fetch_quatt_insights(
+            hass, "2024-01-01", "2024-01-03"
+        )
+
+        assert list(df_hourly["hpHeat"]) == [2000, 3000]
+        assert df_hourly.index.is_monotonic_increasing
+
+    async def test_api_fetch_schedules_one_debounced_save(self, monkeypatch):
+        """Fresh API data schedules a delayed cache write instead of awaiting it."""
+        import pandas as pd
+
+        cache = _FakeCache()
+        quatt = self._patch(monkeypatch, cache, pd.DataFrame())
+        hass, state = _make_hass()
+
+        await quatt.async_fetch_quatt_insights(hass, "2024-01-01", "2024-01-02")
+
+        assert len(state["calls"]) == 2
+        assert cache.saves == 1
+
+    async def test_unchanged_history_window_is_memoized(self, monkeypatch):
+        """A re-run with an unchanged cache skips the historical cache scan."""
+        import pandas as pd
+
+        cache = _FakeCache({"2024-01-05": _day_payload("2024-01-05")})
+        quatt = self._patch(monkeypatch, cache, pd.DataFrame())
+        hass, _ = _make_hass(fail_dates=("2024-03-01",))
+
+        # First run fills the API window into the cache; the second run sees
+        # an unchanged cache from then on
+        await quatt.async_fetch_quatt_insights(hass, "2024-01-01", "2024-03-01")
+        await quatt.async_fetch_quatt_insights(hass, "2024-01-01", "2024-03-01")
+        assert "2024-01-05" in cache.lookups
+
+        cache.lookups.clear()
+        df_hourly, df_daily, _ = await quatt.async_fetch_quatt_insights(
+            hass, "2024-01-01", "2024-03-01"
+        )
+
+        assert "2024-01-05" not in cache.lookups
+        assert pd.Timestamp("2024-01-05") in df_daily.index
+
+    async def test_write_inside_history_window_invalidates_memo(self, monkeypatch):
+        """A historical day cached during an API run is picked up next run."""
+        import pandas as pd
+
+        cache = _FakeCache({"2024-01-05": _day_payload("2024-01-05")})
+        quatt = self._patch(monkeypatch, cache, pd.DataFrame())
+        hass, _ = _make_hass(fail_dates=("2024-03-01",))
+        api_call = hass.services.async_call
+
+        async def _call_and_write_history(*args, **kwargs):
+            # Another writer fills a day inside the history window meanwhile
+            cache.set("2024-01-10", _day_payload("2024-01-10"))
+            return await api_call(*args, **kwargs)
+
+        hass.services.async_call = _call_and_write_history
+        await quatt.async_fetch_quatt_insights(hass, "2024-01-01", "2024-03-01")
+
+        _, df_daily, _ = await quatt.async_fetch_quatt_insights(
+            hass, "2024-01-01", "2024-03-01"
+        )
+
+        assert pd.Timestamp("2024-01-10") in df_daily.index
+
+    def test_clear_history_memo(self, monkeypatch):
+        from custom_components.quatt_stooklijn.analysis import quatt
+
+        monkeypatch.setattr(quatt, "_history_memo", {("a", "b"): (1, ([], [], 0, 0))})
+
+        quatt.clear_history_memo()
+
+        assert quatt._history_memo == {}
+
+
+class TestGetCache:
+    """Tests for the lazily created global insights cache."""
+
+    async def test_concurrent_first_use_loads_once(self, monkeypatch):
+        from custom_components.quatt_stooklijn.analysis import quatt
+
+        loads = []
+
+        class _SlowCache:
+            def __init__(self, hass):
+                pass
+
+            async def async_load(self):
+                loads.append(self)
+                await asyncio.sleep(0.01)
+
+        monkeypatch.setattr(quatt, "_cache", None)
+        monkeypatch.setattr(quatt, "QuattInsightsCache", _SlowCache)
+
+        first, second = await asyncio.gather(
+            quatt._get_cache(MagicMock()), quatt._get_cache(MagicMock())
+        )
+
+        assert first is second
+        assert len(loads) == 1
@@ -10,10 +10,12 @@ from datetime import datetime, timedelta
 
 from custom_components.quatt_stooklijn.analysis.stooklijn import (
     StooklijnResult,
+    _filter_stable_hours,
     _find_knee_by_grid_search,
     apply_throttle_mask,
     calculate_stooklijn,
 )
+from custom_components.quatt_stooklijn.const import MIN_POWER_FILTER
 
 
 class TestFindKneeByGridSearch:
@@ -65,6 +67,132 @@ class TestFindKneeByGridSearch:
         assert knee_t is not None
         assert knee_t == pytest.approx(-2.0, abs=0.5)
 
+    @staticmethod
+    def _reference_search(x, y, step=0.25, min_pts=5):
+        """Per-candidate polyfit loop the vectorized search must reproduce."""
+        best = (None, None, np.inf)
+        for knee_t in np.arange(-4.0, 4.0 + step / 2, step):
+            left, right = x < knee_t, x >= knee_t
+            if left.sum() < min_pts or right.sum() < min_pts:
+                continue
+            sl, il = np.polyfit(x[left], y[left], 1)
+            sr, ir = np.polyfit(x[right], y[right], 1)
+            if sr >= 0 or (sl < 0 and abs(sl) > abs(sr) * 0.75):
+                continue
+            mse = (
+                np.sum((y[left] - (sl * x[left] + il)) ** 2)
+                + np.sum((y[right] - (sr * x[right] + ir)) ** 2)
+            ) / len(x)
+            if mse < best[2]:
+                power = (sl * knee_t + il + sr * knee_t + ir) / 2
+                best = (float(knee_t), float(power), mse)
+        return best[0], best[1]
+
+    def test_matches_per_candidate_polyfit(self):
+        """Closed-form batched fit gives the same knee as the polyfit loop."""
+        rng = np.random.default_rng(42)
+        for knee in (-2.5, 0.0, 1.75):
+            x = rng.uniform(-8, 12, 400)
+            y = np.where(x < knee, 6000.0, 6000.0 - 350.0 * (x - knee))
+            y = y + rng.normal(0, 150, x.size)
+
+            knee_t, knee_p = _find_knee_by_grid_search(x, y)
+            ref_t, ref_p = self._reference_search(x, y)
+
+            assert knee_t == ref_t
+            assert knee_p == pytest.approx(ref_p, rel=1e-9)
+
+    def test_unsorted_input_same_result(self):
+        """Input order does not affect the result."""
+        x, y = self._make_knee_data(knee_temp=1.0, n=60)
+        perm = np.random.default_rng(0).permutation(x.size)
+        assert _find_knee_by_grid_search(x[perm], y[perm]) == pytest.approx(
+            _find_knee_by_grid_search(x, y)
+        )
+
+
+class TestFilterStableHours:
+    """Tests for the 3-hour stability filter."""
+
+    def test_matches_pandas_rolling_std(self):
+        """Direct window std keeps exactly the hours rolling().std() keeps."""
+        rng = np.random.default_rng(7)
+        power = rng.normal(5000, 400, 200)
+        power[::17] = 200.0  # below MIN_POWER_FILTER
+        power[5::23] += 2500.0  # defrost-like spikes
+        df = pd.DataFrame(
+            {"hpHeat": power, "temperatureOutside": rng.uniform(-5, 10, 200)}
+        )
+
+        kept = df[df["hpHeat"] >= MIN_POWER_FILTER]
+        std = kept["hpHeat"].rolling(window=3, center=True, min_periods=1).std()
+        expected = kept[std < kept["hpHeat"].mean() * 0.20]
+
+        result = _filter_stable_hours(df, "hpHeat", "temperatureOutside")
+
+        pd.testing.assert_frame_equal(result, expected)
+        assert "power_rolling_std" not in result.columns
+
+
+class TestPerformKneeDetectionQuatt:
+    """Tests for the memoized Quatt-hourly knee detection."""
+
+    def test_unchanged_hourly_data_reuses_result(self, monkeypatch, hourly_quatt_df):
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        calls = []
+
+        def _search(x, y):
+            calls.append(len(x))
+            return 0.5, 6000.0
+
+        monkeypatch.setattr(stooklijn, "_knee_memo", {})
+        monkeypatch.setattr(stooklijn, "_find_knee_by_grid_search", _search)
+
+        first = stooklijn._perform_knee_detection_quatt(hourly_quatt_df)
+        second = stooklijn._perform_knee_detection_quatt(hourly_quatt_df.copy())
+        assert first == second == (0.5, 6000.0)
+        assert len(calls) == 1
+
+        # A new hour invalidates the memo
+        extra = hourly_quatt_df.iloc[[-1]].copy()
+        extra.index = extra.index + pd.Timedelta(hours=1)
+        stooklijn._perform_knee_detection_quatt(pd.concat([hourly_quatt_df, extra]))
+        assert len(calls) == 2
+
+    def test_changed_middle_row_invalidates_memo(self, monkeypatch, hourly_quatt_df):
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        calls = []
+
+        def _search(x, y):
+            calls.append(len(x))
+            return 0.5, 6000.0
+
+        monkeypatch.setattr(stooklijn, "_knee_memo", {})
+        monkeypatch.setattr(stooklijn, "_find_knee_by_grid_search", _search)
+
+        df = hourly_quatt_df.copy()
+        df.iloc[-1, df.columns.get_loc("hpHeat")] = np.nan
+        stooklijn._perform_knee_detection_quatt(df)
+        # Same content with a NaN last value still hits the memo
+        stooklijn._perform_knee_detection_quatt(df.copy())
+        assert len(calls) == 1
+
+        # Same length and ends, different value in the middle
+        df.iloc[len(df) // 2, df.columns.get_loc("hpHeat")] += 500.0
+        stooklijn._perform_knee_detection_quatt(df)
+        assert len(calls) == 2
+
+    def test_clear_knee_memo(self, monkeypatch):
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        monkeypatch.setattr(stooklijn, "_knee_memo", {(1, 2): (0.5, 6000.0)})
+
+        stooklijn.clear_knee_memo()
+
+        assert stooklijn._knee_memo == {}
+
 
 class TestCalculateStooklijn:
     """Tests for calculate_stooklijn()."""
@@ -98,6 +226,27 @@ class TestCalculateStooklijn:
         assert result.knee_power is not None
         assert result.knee_power > 0
 
+    def test_knee_history_combined_with_recorder(self, live_history_df):
+        """KneeDataStore points are appended to the recorder knee input."""
+        history = pd.DataFrame({"temp": [-6.0, -5.5, -5.0], "power": [6000.0] * 3})
+        with_hist = calculate_stooklijn(
+            live_history_df, None, None, df_knee_history=history
+        )
+        concat = pd.concat(
+            [
+                live_history_df[
+                    (live_history_df["power"] >= MIN_POWER_FILTER)
+                    & (live_history_df["temp"] < 10.0)
+                ][["temp", "power"]],
+                history,
+            ]
+        )
+        expected = _find_knee_by_grid_search(
+            concat["temp"].to_numpy(), concat["power"].to_numpy()
+        )
+
+        assert (with_hist.knee_temperature, with_hist.knee_power) == expected
+
     def test_api_stooklijn_slope(self, live_history_df):
         """API stooklijn (right of knee) should have negative slope."""
         result = calculate_stooklijn(live_history_df, None, None)
@@ -139,6 +288,31 @@ class TestCalculateStooklijn:
         assert "heat" in first
         assert "cop" in first
 
+    def test_scatter_cop_aligned_by_date(self, daily_quatt_df):
+        """Scatter COP comes from the same day; missing COP becomes None."""
+        df = daily_quatt_df.copy()
+        df.iloc[0, df.columns.get_loc("averageCOP")] = np.nan
+        result = calculate_stooklijn(None, None, df)
+
+        first, second = result.scatter_data[0], result.scatter_data[1]
+        assert first["cop"] is None
+        assert second["temp"] == round(float(df["avg_temperatureOutside"].iloc[1]), 1)
+        assert second["cop"] == float(df["averageCOP"].iloc[1])
+        assert isinstance(second["heat"], float)
+
+    def test_non_finite_days_excluded(self, daily_quatt_df):
+        """Days with inf/NaN temperature, heat or COP never reach the scatter."""
+        df = daily_quatt_df.copy()
+        df.iloc[0, df.columns.get_loc("totalHeatPerHour")] = np.inf
+        df.iloc[1, df.columns.get_loc("averageCOP")] = -np.inf
+        df.iloc[2, df.columns.get_loc("avg_temperatureOutside")] = np.nan
+        result = calculate_stooklijn(None, None, df)
+        baseline = calculate_stooklijn(None, None, daily_quatt_df)
+
+        assert len(result.scatter_data) == len(baseline.scatter_data) - 2
+        # COP scatter only needs finite temperature and COP
+        assert len(result.cop_scatter_data) == len(baseline.cop_scatter_data) - 2
+
     def test_cop_scatter_data(self, daily_quatt_df):
         """COP scatter data should be populated when averageCOP column exists."""
         result = calculate_stooklijn(None, None, daily_quatt_df)
@@ -197,6 +371,210 @@ class TestCalculateStooklijn:
         assert result.slope_optimal is None
 
 
+class TestFetchLiveHistory:
+    """Tests for async_fetch_live_history() state parsing and merge."""
+
+    async def test_minute_medians_merged(self, monkeypatch, mock_recorder):
+        from datetime import timezone
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock
+
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        def _st(value, minute, second=0):
+            ts = datetime(2024, 1, 1, 12, minute, second, tzinfo=timezone.utc)
+            return SimpleNamespace(state=value, last_changed=ts)
+
+        states = {
+            "sensor.temp": [_st("1.0", 0), _st("3.0", 0, 30), _st("2.0", 1)],
+            "sensor.power": [_st("4000", 0), _st("unavailable", 1), _st("5000", 1, 10)],
+        }
+        mock_recorder(stooklijn)
+        monkeypatch.setattr(stooklijn, "_live_history_cache", {})
+        monkeypatch.setattr(
+            stooklijn,
+            "state_changes_during_period",
+            lambda hass, start, end, entity_id, **kw: {
+                entity_id: states.get(entity_id, [])
+            },
+        )
+
+        merged = await stooklijn.async_fetch_live_history(
+            MagicMock(), ["sensor.missing", "sensor.temp"], "sensor.power"
+        )
+
+        assert list(merged.columns) == ["temp", "power"]
+        assert merged.index.tz is None
+        assert merged.index.name == "timestamp"
+        assert list(merged["temp"]) == [2.0, 2.0]
+        assert list(merged["power"]) == [4000.0, 5000.0]
+        assert merged.index[1] == pd.Timestamp("2024-01-01 12:01")
+
+    async def test_power_and_first_temp_fetched_concurrently(self, monkeypatch, mock_recorder):
+        from unittest.mock import MagicMock
+
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        instance = mock_recorder(stooklijn)
+        instance.delay = 0.01
+        monkeypatch.setattr(stooklijn, "_live_history_cache", {})
+        monkeypatch.setattr(
+            stooklijn,
+            "state_changes_during_period",
+            lambda hass, start, end, entity_id, **kw: {},
+        )
+
+        result = await stooklijn.async_fetch_live_history(
+            MagicMock(), ["sensor.temp"], "sensor.power"
+        )
+
+        assert result is None
+        assert instance.peak == 2
+
+    async def test_second_fetch_is_incremental(self, monkeypatch, mock_recorder):
+        from datetime import timezone
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock
+
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        t0 = datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc)
+        history = {"sensor.power": [SimpleNamespace(state="4000", last_changed=t0)]}
+        queries = []
+
+        def _changes(hass, start, end, entity_id, include_start_time_state=True):
+            queries.append((start, include_start_time_state))
+            return {
+                entity_id: [
+                    s for s in history[entity_id] if start <= s.last_changed <= end
+                ]
+            }
+
+        mock_recorder(stooklijn)
+        monkeypatch.setattr(stooklijn, "state_changes_during_period", _changes)
+        monkeypatch.setattr(stooklijn, "_live_history_cache", {})
+
+        first = await stooklijn._async_entity_history(
+            MagicMock(), "sensor.power", t0 - timedelta(days=1), t0
+        )
+        t1 = t0 + timedelta(minutes=5)
+        history["sensor.power"].append(SimpleNamespace(state="4500", last_changed=t1))
+        second = await stooklijn._async_entity_history(
+            MagicMock(), "sensor.power", t1 - timedelta(days=1), t1
+        )
+
+        assert list(first) == [4000.0]
+        assert list(second) == [4000.0, 4500.0]
+        assert queries == [
+            (t0 - timedelta(days=1), True),
+            (t0 - stooklijn._LIVE_HISTORY_OVERLAP, False),
+        ]
+
+    async def test_incremental_fetch_reads_late_commits(self, monkeypatch, mock_recorder):
+        from datetime import timezone
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock
+
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        t0 = datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc)
+        history = {
+            "sensor.power": [
+                SimpleNamespace(state="3000", last_changed=t0 - timedelta(minutes=10)),
+                SimpleNamespace(state="4000", last_changed=t0 - timedelta(minutes=1)),
+            ]
+        }
+
+        def _changes(hass, start, end, entity_id, include_start_time_state=True):
+            return {
+                entity_id: sorted(
+                    (s for s in history[entity_id] if start <= s.last_changed <= end),
+                    key=lambda s: s.last_changed,
+                )
+            }
+
+        mock_recorder(stooklijn)
+        monkeypatch.setattr(stooklijn, "state_changes_during_period", _changes)
+        monkeypatch.setattr(stooklijn, "_live_history_cache", {})
+
+        await stooklijn._async_entity_history(
+            MagicMock(), "sensor.power", t0 - timedelta(days=1), t0
+        )
+        # Stamped before the previous fetch end, but committed after it
+        history["sensor.power"].append(
+            SimpleNamespace(state="3500", last_changed=t0 - timedelta(minutes=3))
+        )
+        t1 = t0 + timedelta(minutes=5)
+        second = await stooklijn._async_entity_history(
+            MagicMock(), "sensor.power", t1 - timedelta(days=1), t1
+        )
+
+        assert list(second) == [3000.0, 3500.0, 4000.0]
+        assert second.index.is_unique
+        assert second.index.is_monotonic_increasing
+
+    async def test_incremental_fetch_matches_full_fetch(self, monkeypatch, mock_recorder):
+        from datetime import timezone
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock
+
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        t0 = datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc)
+        # Hourly states, plus two distinct states sharing one timestamp
+        history = [
+            SimpleNamespace(state=str(1000.0 + h), last_changed=t0 - timedelta(hours=h))
+            for h in range(30, 0, -1)
+        ]
+        history.append(SimpleNamespace(state="5000", last_changed=t0 - timedelta(hours=12)))
+
+        def _changes(hass, start, end, entity_id, include_start_time_state=True):
+            # Like the recorder: changes after start, plus (optionally) the
+            # state in effect at start, stamped at start
+            ordered = sorted(history, key=lambda s: s.last_changed)
+            result = [s for s in ordered if start < s.last_changed <= end]
+            prior = [s for s in ordered if s.last_changed <= start]
+            if include_start_time_state and prior:
+                result.insert(0, SimpleNamespace(state=prior[-1].state, last_changed=start))
+            return {entity_id: result}
+
+        mock_recorder(stooklijn)
+        monkeypatch.setattr(stooklijn, "state_changes_during_period", _changes)
+        monkeypatch.setattr(stooklijn, "_live_history_cache", {})
+
+        await stooklijn._async_entity_history(
+            MagicMock(), "sensor.power", t0 - timedelta(days=1), t0
+        )
+        # A late commit inside the overlap and a new state after t0
+        history.append(SimpleNamespace(state="4200", last_changed=t0 - timedelta(minutes=2)))
+        history.append(SimpleNamespace(state="4300", last_changed=t0 + timedelta(minutes=30)))
+        # Window slides past a state change: the start state must be carried
+        t1 = t0 + timedelta(hours=1, minutes=30)
+        window = (t1 - timedelta(days=1), t1)
+
+        incremental = await stooklijn._async_entity_history(
+            MagicMock(), "sensor.power", *window
+        )
+        stooklijn._live_history_cache.clear()
+        full = await stooklijn._async_entity_history(MagicMock(), "sensor.power", *window)
+
+        pd.testing.assert_series_equal(incremental, full)
+        assert (full.index == pd.Timestamp("2024-01-10 00:00")).sum() == 2
+
+    def test_clear_live_history_cache(self, monkeypatch):
+        from custom_components.quatt_stooklijn.analysis import stooklijn
+
+        monkeypatch.setattr(
+            stooklijn,
+            "_live_history_cache",
+            {"sensor.power": (datetime(2024, 1, 1), pd.Series(dtype=float))},
+        )
+
+        stooklijn.clear_live_history_cache()
+
+        assert stooklijn._live_history_cache == {}
+
+
 class TestApplyThrottleMask:
     """Tests voor de throttle-masking (energy-os datahygiëne)."""
 
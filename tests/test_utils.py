@@ -0,0 +1,122 @@
+"""Unit tests for shared analysis utilities."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from custom_components.quatt_stooklijn.analysis.utils import (
+    calc_r2,
+    calc_r2_linear,
+    daily_mean,
+    linear_fit,
+    robust_linear_fit,
+    states_to_series,
+)
+
+
+class TestLinearFit:
+    """Tests for the closed-form linear_fit() helper."""
+
+    def test_matches_polyfit(self):
+        """Closed-form OLS should agree with np.polyfit on noisy data."""
+        rng = np.random.default_rng(7)
+        x = np.linspace(-10, 15, 60)
+        y = -180 * x + 3500 + rng.normal(0, 150, size=x.size)
+
+        slope, intercept = linear_fit(x, y)
+        ref_slope, ref_intercept = np.polyfit(x, y, 1)
+
+        assert slope == pytest.approx(ref_slope, rel=1e-9)
+        assert intercept == pytest.approx(ref_intercept, rel=1e-9)
+
+    def test_large_offset_stays_accurate(self):
+        """Mean-centering keeps the fit exact when x sits far from zero."""
+        x = 1e6 + np.linspace(0, 1, 50)
+        y = 2.5 * x - 1e6
+
+        slope, intercept = linear_fit(x, y)
+
+        assert slope == pytest.approx(2.5, rel=1e-9)
+        assert slope * x[0] + intercept == pytest.approx(y[0], rel=1e-9)
+
+    def test_constant_x_gives_flat_line(self):
+        """All-equal x has no defined slope → flat line through mean(y)."""
+        slope, intercept = linear_fit(np.full(5, 3.0), np.arange(5.0))
+
+        assert slope == 0.0
+        assert intercept == pytest.approx(2.0)
+
+    def test_r2_linear_matches_calc_r2(self):
+        """Sum-based R² should equal the residual-based R² for an OLS line."""
+        rng = np.random.default_rng(11)
+        x = np.linspace(-8, 14, 40)
+        y = -210 * x + 3900 + rng.normal(0, 300, size=x.size)
+        slope, intercept = linear_fit(x, y)
+
+        assert calc_r2_linear(x, y, slope) == pytest.approx(
+            calc_r2(y, slope * x + intercept), rel=1e-9
+        )
+
+
+class TestRobustLinearFit:
+    """Tests for the two-pass robust_linear_fit() helper."""
+
+    def test_outlier_dropped_and_inputs_untouched(self):
+        rng = np.random.default_rng(3)
+        x = np.linspace(-5, 10, 40)
+        y = -200 * x + 4000 + rng.normal(0, 50, x.size)
+        y[7] += 3000
+        x_orig, y_orig = x.copy(), y.copy()
+
+        slope, intercept, mask = robust_linear_fit(x, y)
+
+        assert not mask[7]
+        assert mask.sum() == x.size - 1
+        assert slope == pytest.approx(-200, rel=0.05)
+        np.testing.assert_array_equal(x, x_orig)
+        np.testing.assert_array_equal(y, y_orig)
+
+
+class TestDailyMean:
+    """Tests for the bincount-based daily_mean() helper."""
+
+    def test_matches_groupby_date(self):
+        idx = pd.date_range("2024-01-01", periods=96, freq="h", tz="Europe/Amsterdam")
+        values = np.arange(96.0)
+        values[30:50] = np.nan
+        series = pd.Series(values, index=idx)
+
+        result = daily_mean(series)
+        expected = series.groupby(series.index.date).mean()
+
+        assert result.index.tz is None
+        assert list(result.index.date) == list(expected.index)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+
+    def test_all_nan_returns_empty(self):
+        idx = pd.date_range("2024-01-01", periods=5, freq="h")
+        assert daily_mean(pd.Series(np.nan, index=idx)).empty
+
+
+class TestStatesToSeries:
+    """Test parsing recorder states into a naive-UTC float Series."""
+
+    def test_skips_non_numeric_and_strips_tz(self):
+        from datetime import datetime, timezone
+        from types import SimpleNamespace
+
+        states = [
+            SimpleNamespace(state="100.0", last_changed=datetime(2024, 1, 1, 0, tzinfo=timezone.utc)),
+            SimpleNamespace(state="unavailable", last_changed=datetime(2024, 1, 1, 1, tzinfo=timezone.utc)),
+            SimpleNamespace(state="100.5", last_changed=datetime(2024, 1, 1, 2, tzinfo=timezone.utc)),
+        ]
+        series = states_to_series(states)
+
+        assert list(series) == [100.0, 100.5]
+        assert series.index.tz is None
+        assert series.index[1] == pd.Timestamp("2024-01-01 02:00")
+
+    def test_empty_states(self):
+        assert states_to_series([]).empty